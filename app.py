@@ -1,22 +1,28 @@
 import streamlit as st
+import os
 import random
+import metrics
 # Ensure model.py is correctly updated with all previous fixes
-from model import recommend, get_all_movies, get_all_actors, get_all_directors, get_all_genres, get_movie_details_from_df
+from model import recommend, get_all_movies, get_all_actors, get_all_directors, get_all_genres, get_movie_details_from_df, get_movie_details_many, search_titles
+from model import ensure_loaded, load_in_background, warm_recommend_cache
 from utils import get_movie_details as get_movie_details_tmdb # Renamed to avoid clash with local function
+from utils import get_movie_details_many as get_movie_details_many_tmdb
 
 st.set_page_config(page_title="Movie Recommender", layout="wide")
 
+# Optional Prometheus endpoint for the metrics (see metrics.py), started once per process
+if os.getenv("METRICS_PORT"):
+    metrics.start_http_server(int(os.getenv("METRICS_PORT")))
+
+# Start loading the model once per process, without waiting for it: the header and the search
+# box render right away, the rest of the page waits until the model is ready
+model_ready = load_in_background()
+
 # ----------------- Session State Initialization -----------------
 if "favorite" not in st.session_state:
     st.session_state.favorite = None
 if "page" not in st.session_state:
     st.session_state.page = 0
-# Initialize and cache popular_movies data and pages ONLY ONCE
-if "popular_movies_data" not in st.session_state:
-    all_movies_items = list(get_all_movies().items())
-    num_samples = min(30, len(all_movies_items))
-    st.session_state.popular_movies_data = random.sample(all_movies_items, num_samples)
-    st.session_state.popular_movies_pages = [st.session_state.popular_movies_data[i:i+10] for i in range(0, len(st.session_state.popular_movies_data), 10)]
 # Initialize search results if not present
 if "search_results_display" not in st.session_state:
     st.session_state.search_results_display = []
@@ -35,17 +41,40 @@ def get_no_poster_placeholder_st(height="150px"):
 st.title("🎬 Movie Recommender")
 
 # ----------------- Favorite Movie Search Input -----------------
-all_movies = get_all_movies()
 fav_movie_input = st.text_input("Search for your favorite movie", key="fav_input")
 
+# Everything below needs the model
+if not model_ready.is_set():
+    with st.spinner("Loading the movie catalog..."):
+        ensure_loaded() # waits for the background load (or retries it if it failed)
+
+# Initialize and cache popular_movies data and pages ONLY ONCE
+if "popular_movies_data" not in st.session_state:
+    all_movies_items = list(get_all_movies().items())
+    num_samples = min(30, len(all_movies_items))
+    st.session_state.popular_movies_data = random.sample(all_movies_items, num_samples)
+    st.session_state.popular_movies_pages = [st.session_state.popular_movies_data[i:i+10] for i in range(0, len(st.session_state.popular_movies_data), 10)]
+
+# Once per process (and again every 10 minutes): precompute the recommendations of the
+# favorites users of this process picked most so far
+@st.cache_resource(ttl=600, show_spinner=False)
+def warm_popular_recommendations():
+    return warm_recommend_cache()
+
+warm_popular_recommendations()
+
+all_movies = get_all_movies()
 if fav_movie_input:
-    filtered_titles = [m_title for m_title in all_movies.keys() if fav_movie_input.lower() in m_title.lower()]
-    st.session_state.search_results_display = filtered_titles[:10]
+    st.session_state.search_results_display = search_titles(fav_movie_input, limit=10)
 
     if st.session_state.search_results_display:
         st.markdown("#### Search Results:")
         search_grid_layout = st.columns(5)
 
+        # Fetch the details of all results in one go (cached, misses fetched in parallel)
+        search_ids = [all_movies[name] for name in st.session_state.search_results_display if all_movies.get(name)]
+        search_details = dict(zip(search_ids, get_movie_details_many_tmdb(search_ids)))
+
         for i in range(10):
             with search_grid_layout[i % 5]:
                 if i < len(st.session_state.search_results_display):
@@ -54,7 +83,7 @@ if fav_movie_input:
 
                     poster_url, rating, _ = "", "N/A", ""
                     if tmdb_id:
-                        poster_url, rating, _ = get_movie_details_tmdb(tmdb_id)
+                        poster_url, rating, _ = search_details[tmdb_id]
 
                     # --- Pure Streamlit display for search results ---
                     if poster_url:
@@ -93,7 +122,7 @@ if st.session_state.favorite:
 
     if tmdb_id:
         poster_url, rating, tagline = get_movie_details_tmdb(tmdb_id)
-        local_details = get_movie_details_from_df(st.session_state.favorite)
+        local_details = get_movie_details_from_df(st.session_state.favorite, tmdb_id)
 
         fav_cols = st.columns([1, 4])
 
@@ -154,13 +183,14 @@ with cols[1]:
         st.session_state.page = 0
 
     grid = pages[current_page_idx]
+    grid_details = dict(zip([tmdb_id for _, tmdb_id in grid], get_movie_details_many_tmdb([tmdb_id for _, tmdb_id in grid])))
     for row_idx in range(2):
         cols_row = st.columns(5)
         for col_idx in range(5):
             idx = row_idx * 5 + col_idx
             if idx < len(grid):
                 name, tmdb_id = grid[idx]
-                poster_url, rating, _ = get_movie_details_tmdb(tmdb_id)
+                poster_url, rating, _ = grid_details[tmdb_id]
 
                 with cols_row[col_idx]:
                     # --- Pure Streamlit display for popular movies ---
@@ -207,14 +237,14 @@ if st.button("Recommend Movies 🎯"):
         if not recommendations:
             st.info("No recommendations found based on your criteria. Try different preferences!")
         else:
-            for rec in recommendations:
+            rec_details = get_movie_details_many_tmdb([rec['tmdb_id'] for rec in recommendations])
+            rec_local_details = get_movie_details_many([rec['title'] for rec in recommendations],
+                                                       [rec['tmdb_id'] for rec in recommendations])
+            for rec, (poster_url, rating, tagline), local_details in zip(recommendations, rec_details, rec_local_details):
                 title = rec['title']
                 tmdb_id = rec['tmdb_id']
                 reason = rec['reason']
 
-                poster_url, rating, tagline = get_movie_details_tmdb(tmdb_id)
-                local_details = get_movie_details_from_df(title)
-
                 cols_rec = st.columns([1, 4])
                 with cols_rec[0]:
                     # --- Pure Streamlit display for recommended movies ---
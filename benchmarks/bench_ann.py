@@ -0,0 +1,90 @@
+# benchmarks/bench_ann.py
+# Recall@50 and build time of the approximate (IVF) neighbor backend against the exact one, on
+# the bundled catalog and on synthetic catalogs scaled up from it.
+# Exact neighbors are computed for a sample of query movies; the full exact build time is
+# extrapolated from it (it grows with N^2).
+# Run from the repository root: python benchmarks/bench_ann.py [--scales 1 10 100] [--queries 500]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import model
+
+# (n_probe, max_postings) settings to compare, cheapest first
+SETTINGS = [(2, 100), (4, 250), (8, 250), (8, 1000)]
+
+
+def synthetic_soups(soups, scale, seed=0):
+    """scale x as many soups, each mixing the words of two real movies (half from each)."""
+    if scale == 1:
+        return list(soups)
+    rng = np.random.default_rng(seed)
+    words = [soup.split() for soup in soups]
+    n = len(words) * scale
+    bases, donors = rng.integers(len(words), size=n), rng.integers(len(words), size=n)
+    result = []
+    for base, donor in zip(bases.tolist(), donors.tolist()):
+        mixed = [w for w in words[base] if rng.random() < 0.5] + [w for w in words[donor] if rng.random() < 0.5]
+        result.append(' '.join(mixed))
+    return result
+
+
+def exact_neighbors(matrix, rows, k):
+    n = matrix.shape[0]
+    chunk_rows = max(1, model.NEIGHBOR_BLOCK_BYTES // (n * 8))
+    parts = [model._top_k(cosine_similarity(matrix[rows[i:i + chunk_rows]], matrix), k)[0]
+             for i in range(0, len(rows), chunk_rows)]
+    return np.vstack(parts)
+
+
+def recall(approx, exact):
+    return float(np.mean([len(np.intersect1d(a, e)) / len(e) for a, e in zip(approx, exact)]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--full-build-max', type=int, default=60000,
+                        help="largest catalog to run a full IVF build on (larger ones use the query sample)")
+    args = parser.parse_args()
+    k = model.NEIGHBORS_K
+    base_soups = model.prepare_movies(model.read_catalog())['soup'].fillna('').tolist()
+
+    for scale in args.scales:
+        soups = synthetic_soups(base_soups, scale)
+        matrix = TfidfVectorizer(stop_words='english').fit_transform(soups)
+        n = matrix.shape[0]
+        rows = np.random.default_rng(1).choice(n, min(args.queries, n), replace=False)
+
+        start = time.perf_counter()
+        exact = exact_neighbors(matrix, rows, k)
+        exact_full = (time.perf_counter() - start) / len(rows) * n
+        print(f"\n{n} movies (x{scale}), {matrix.shape[1]} terms: exact build ~{exact_full:.1f}s (extrapolated)")
+
+        for n_probe, max_postings in SETTINGS:
+            if n <= args.full_build_max:
+                start = time.perf_counter()
+                indices, _, stats = model.build_neighbors_ivf(matrix, k, n_probe=n_probe, max_postings=max_postings)
+                build = time.perf_counter() - start
+                approx, label = indices[rows], "full build"
+            else:
+                # The whole catalog is clustered, but lists are only computed for the sample
+                approx, _, stats = model.build_neighbors_ivf(matrix, k, n_probe=n_probe, max_postings=max_postings, rows=rows)
+                per_query = stats['query_seconds'] / len(rows)
+                build, label = stats['index_seconds'] + per_query * n, "extrapolated"
+            print(f"  n_probe={n_probe:<2d} max_postings={max_postings:<4d} recall@{k} {recall(approx, exact):.3f}  "
+                  f"compared/movie {stats['mean_compared']:8.0f} ({stats['mean_compared'] / n:6.2%})  "
+                  f"build {build:8.1f}s ({label}, x{exact_full / build:.1f} vs exact)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_build.py
+# Speedup curve of the model build over worker processes: CSV parsing (prepare_movies),
+# TF-IDF fit and the neighbor index, for 1..N jobs. --scale repeats the catalog (with new ids)
+# to see how the curve looks for larger catalogs.
+# Run from the repository root: python benchmarks/bench_build.py [--jobs 1 2 4] [--scale 4]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import model
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, nargs='+',
+                        default=sorted({1, *[2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus], cpus}))
+    parser.add_argument('--scale', type=int, default=1, help="repeat the catalog this many times")
+    args = parser.parse_args()
+
+    merged = model.read_catalog()
+    if args.scale > 1:
+        step = int(pd.to_numeric(merged['id'], errors='coerce').max()) + 1
+        merged = pd.concat([merged.assign(id=pd.to_numeric(merged['id'], errors='coerce') + i * step)
+                            for i in range(args.scale)], ignore_index=True)
+    print(f"{len(merged)} merged rows, {cpus} CPU(s)")
+
+    baseline = None
+    reference = None
+    for jobs in args.jobs:
+        prepared, parse_time = timed(lambda: model.prepare_movies(merged, n_jobs=jobs))
+        matrix, tfidf_time = timed(lambda: TfidfVectorizer(stop_words='english').fit_transform(prepared['soup']))
+        (indices, _, _), neighbor_time = timed(lambda: model.build_neighbors(matrix, n_jobs=jobs))
+        total = parse_time + tfidf_time + neighbor_time
+        if baseline is None:
+            baseline, reference = total, (prepared, indices)
+        same = prepared.equals(reference[0]) and (indices == reference[1]).all()
+        print(f"{jobs:3d} jobs: parse {parse_time:7.3f}s  tfidf {tfidf_time:7.3f}s  neighbors {neighbor_time:7.3f}s  "
+              f"total {total:7.3f}s  speedup x{baseline / total:4.2f}  {'identical' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
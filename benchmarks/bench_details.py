@@ -0,0 +1,51 @@
+# benchmarks/bench_details.py
+# Times the detail lookups the app does per rerun (favorite + recommendations): the old
+# pandas title -> row lookup per title against get_movie_details_from_df and get_movie_details_many.
+# Run from the repository root: python benchmarks/bench_details.py
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import model
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def series_lookup(title_to_index, titles):
+    # What get_movie_details_from_df did before: a pandas lookup per title
+    rows = []
+    for title in titles:
+        row = title_to_index[title]
+        rows.append(row.iloc[0] if isinstance(row, pd.Series) else row)
+    return rows
+
+
+def main():
+    rng = random.Random(0)
+    titles = list(model.get_all_movies())
+    duplicates = list(model._duplicate_title_rows)
+    print(f"{len(titles)} titles, {len(duplicates)} shared by several movies")
+    title_to_index = pd.Series(model.movies.index, index=model.movies['title']) # the old mapping
+
+    for label, page in (("unique titles", rng.sample(titles, 6)),
+                        ("duplicate titles", rng.sample(duplicates, min(6, len(duplicates))))):
+        old = per_call_us(lambda: series_lookup(title_to_index, page), 200)
+        single = per_call_us(lambda: [model.get_movie_details_from_df(title) for title in page], 200)
+        many = per_call_us(lambda: model.get_movie_details_many(page), 200)
+        print(f"{label:16s} page of {len(page)}: title_to_index lookups {old:8.1f} us  "
+              f"get_movie_details_from_df x{len(page)} {single:8.1f} us  get_movie_details_many {many:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
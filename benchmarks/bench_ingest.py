@@ -0,0 +1,90 @@
+# benchmarks/bench_ingest.py
+# Peak memory (max RSS growth, each run in a fresh process) and time of reading + preparing the
+# catalog: whole CSVs (read_catalog + prepare_movies) against streamed ones (stream_catalog).
+# --scale inflates the credits and keywords files with extra movies that are not in the
+# metadata, like the untrimmed TMDB files.
+# Run from the repository root: python benchmarks/bench_ingest.py [--scale 1 5 20] [--chunk-rows 2000]
+
+import argparse
+import hashlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import model
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # KiB on Linux
+
+
+def child(mode, metadata, credits, keywords, chunk_rows):
+    """Runs one ingestion in this (fresh) process and prints its peak RSS growth as JSON."""
+    before = max_rss_mb()
+    start = time.perf_counter()
+    if mode == 'whole':
+        prepared = model.prepare_movies(model.read_catalog(metadata, credits, keywords))
+    else:
+        prepared = model.stream_catalog(metadata, credits, keywords, chunk_rows=chunk_rows)
+    elapsed = time.perf_counter() - start
+    digest = hashlib.sha256('\n'.join(prepared['title'].astype(str) + '|' + prepared['soup']).encode()).hexdigest()
+    print(json.dumps({'seconds': elapsed, 'peak_mb': max_rss_mb() - before, 'movies': len(prepared), 'digest': digest}))
+
+
+def measure(mode, metadata, credits, keywords, chunk_rows):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, metadata, credits, keywords,
+                             str(chunk_rows)], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def inflate(path, scale, target):
+    """Writes `path` with scale - 1 extra copies of its rows under ids nobody else uses."""
+    frame = pd.read_csv(path)
+    ids = pd.to_numeric(frame['id'], errors='coerce')
+    step = int(ids.max()) + 1
+    copies = [frame] + [frame.assign(id=ids + i * step) for i in range(1, scale)]
+    pd.concat(copies, ignore_index=True).to_csv(target, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--chunk-rows', type=int, default=2000)
+    parser.add_argument('--child', nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        mode, metadata, credits, keywords, chunk_rows = args.child
+        return child(mode, metadata, credits, keywords, int(chunk_rows))
+    mb = 1024 * 1024
+    metadata_path, credits_path, keywords_path = model.DATA_FILES
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for scale in args.scale:
+            credits, keywords = credits_path, keywords_path
+            if scale > 1:
+                credits, keywords = os.path.join(tmp, 'credits.csv'), os.path.join(tmp, 'keywords.csv')
+                inflate(credits_path, scale, credits)
+                inflate(keywords_path, scale, keywords)
+            size = (os.path.getsize(credits) + os.path.getsize(keywords)) / mb
+
+            whole = measure('whole', metadata_path, credits, keywords, args.chunk_rows)
+            streamed = measure('stream', metadata_path, credits, keywords, args.chunk_rows)
+            status = "identical" if whole['digest'] == streamed['digest'] else "MISMATCH"
+            print(f"x{scale:<3d} credits+keywords {size:7.1f} MB: whole +{whole['peak_mb']:6.1f} MB {whole['seconds']:6.2f}s  "
+                  f"streamed +{streamed['peak_mb']:6.1f} MB {streamed['seconds']:6.2f}s  ({streamed['movies']} movies, {status})")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_memory.py
+# Memory of the loaded model: process RSS, and the compact movies table (tmdb_id/title plus the
+# dictionary-encoded actor/genre/director lists) against the old wide frame with the soup,
+# genre/director strings and per-row actor lists.
+# Run from the repository root: python benchmarks/bench_memory.py
+
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imported before the first RSS reading, so that the model's share excludes the libraries
+LIBRARIES = ('numpy', 'pandas', 'scipy.sparse', 'sklearn.decomposition', 'sklearn.feature_extraction.text',
+             'sklearn.metrics.pairwise', 'sklearn.preprocessing')
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def deep_size(value):
+    """Bytes held by a list of names, including the strings (shared strings counted once)."""
+    seen, total = set(), sys.getsizeof(value)
+    for item in value:
+        if id(item) not in seen:
+            seen.add(id(item))
+            total += sys.getsizeof(item)
+    return total
+
+
+def encoded_size(lists):
+    return deep_size(lists.names) + lists.ids.nbytes + lists.offsets.nbytes
+
+
+def main():
+    mb = 1024 * 1024
+    for name in LIBRARIES:
+        importlib.import_module(name)
+    libs = rss_mb()
+    import model
+    model.ensure_loaded() # the artifact if there is one
+    loaded = rss_mb()
+
+    table = model.movies.memory_usage(deep=True).sum()
+    facets = {name: encoded_size(lists) for name, lists in
+              (('actors', model.movie_actors), ('genres', model.movie_genres), ('directors', model.movie_directors))}
+    print(f"RSS: {libs:.1f} MB with the libraries, {loaded:.1f} MB after loading {len(model.movies)} movies "
+          f"(+{loaded - libs:.1f} MB)")
+    print(f"compact table: {table / mb:.2f} MB (tmdb_id, title) + "
+          + " + ".join(f"{size / mb:.2f} MB {name}" for name, size in facets.items())
+          + f" = {(table + sum(facets.values())) / mb:.2f} MB")
+
+    legacy = model.prepare_movies(model.read_catalog())
+    legacy_rss = rss_mb()
+    print(f"old wide frame: {legacy.memory_usage(deep=True).sum() / mb:.2f} MB "
+          f"(soup alone {legacy['soup'].memory_usage(deep=True) / mb:.2f} MB), RSS {legacy_rss:.1f} MB once built")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/bench_neighbors.py
+# Compares peak memory of the dense all-pairs similarity matrix against the chunked top-k neighbor build.
+# Run from the repository root: python benchmarks/bench_neighbors.py
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import model
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+
+def main():
+    soup_matrix = TfidfVectorizer(stop_words='english').fit_transform(model.prepare_movies(model.read_catalog())['soup'].fillna(''))
+    mb = 1024 * 1024
+
+    _, elapsed, current, peak = measure(lambda: cosine_similarity(soup_matrix, soup_matrix))
+    print(f"dense cos_sim:   {elapsed:7.3f}s  steady {current / mb:8.1f} MB  peak {peak / mb:8.1f} MB")
+
+    (_, _, stats), elapsed, current, peak = measure(lambda: model.build_neighbors(soup_matrix))
+    print(f"top-k neighbors: {elapsed:7.3f}s  steady {current / mb:8.1f} MB  peak {peak / mb:8.1f} MB")
+    print(f"  {stats}")
+
+
+if __name__ == "__main__":
+    main()
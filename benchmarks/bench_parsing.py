@@ -0,0 +1,112 @@
+# benchmarks/bench_parsing.py
+# Compares the field-scanning extractors in model.py against parsing every cell with ast.literal_eval,
+# on the bundled columns and on the same cells written as JSON and without spaces.
+# Run from the repository root: python benchmarks/bench_parsing.py
+
+import ast
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import model
+
+
+def extract_names_ast(json_str, key='name', topn=None, as_list=False):
+    """The previous extract_names: parses the whole literal."""
+    try:
+        items = ast.literal_eval(json_str)
+        names = [item[key] for item in items]
+        if as_list:
+            return names[:topn] if topn else names
+        else:
+            return ' '.join(names[:topn]) if topn else ' '.join(names)
+    except (ValueError, SyntaxError, TypeError):
+        return [] if as_list else ''
+
+
+def get_director_ast(crew_str):
+    """The previous get_director: parses the whole literal."""
+    try:
+        crew = ast.literal_eval(crew_str)
+        for member in crew:
+            if member.get('job') == 'Director':
+                return member.get('name', '')
+        return ''
+    except (ValueError, SyntaxError, TypeError):
+        return ''
+
+
+def rewritten(values, dump):
+    """The same cells, each parsed and written back with `dump` (cells ast can't parse are kept)."""
+    cells = []
+    for value in values:
+        try:
+            cells.append(dump(ast.literal_eval(value)))
+        except (ValueError, SyntaxError, TypeError):
+            cells.append(value)
+    return cells
+
+
+def compact_literal(value):
+    """A Python literal with no space after ':' and ','."""
+    if isinstance(value, list):
+        return '[' + ','.join(compact_literal(item) for item in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{key!r}:{compact_literal(item)}' for key, item in value.items()) + '}'
+    return repr(value)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    metadata_path, credits_path, keywords_path = model.DATA_FILES
+    genres = pd.read_csv(metadata_path)['genres']
+    credits = pd.read_csv(credits_path)
+    keywords = pd.read_csv(keywords_path)['keywords']
+    genres_json, crew_json = rewritten(genres, json.dumps), rewritten(credits['crew'], json.dumps)
+    cast_json = rewritten(credits['cast'], json.dumps)
+    genres_compact, crew_compact = rewritten(genres, compact_literal), rewritten(credits['crew'], compact_literal)
+
+    cases = [
+        ("genres", lambda: [extract_names_ast(v) for v in genres],
+                   lambda: model.extract_names_column(genres)),
+        ("keywords", lambda: [extract_names_ast(v) for v in keywords],
+                     lambda: model.extract_names_column(keywords)),
+        ("cast top 3", lambda: [extract_names_ast(v, topn=3, as_list=True) for v in credits['cast']],
+                       lambda: model.extract_names_column(credits['cast'], topn=3, as_list=True)),
+        ("crew director", lambda: [get_director_ast(v) for v in credits['crew']],
+                          lambda: model.get_director_column(credits['crew'])),
+        ("genres json", lambda: [extract_names_ast(v) for v in genres_json],
+                        lambda: model.extract_names_column(genres_json)),
+        ("cast json", lambda: [extract_names_ast(v, topn=3, as_list=True) for v in cast_json],
+                      lambda: model.extract_names_column(cast_json, topn=3, as_list=True)),
+        ("crew json", lambda: [get_director_ast(v) for v in crew_json],
+                      lambda: model.get_director_column(crew_json)),
+        ("genres compact", lambda: [extract_names_ast(v) for v in genres_compact],
+                           lambda: model.extract_names_column(genres_compact)),
+        ("crew compact", lambda: [get_director_ast(v) for v in crew_compact],
+                         lambda: model.get_director_column(crew_compact)),
+    ]
+
+    total_old = total_new = 0.0
+    for name, old_fn, new_fn in cases:
+        expected, old_time = timed(old_fn)
+        result, new_time = timed(new_fn)
+        total_old += old_time
+        total_new += new_time
+        status = "identical" if result == expected else "MISMATCH"
+        print(f"{name:14s} ast {old_time:7.3f}s  scan {new_time:7.3f}s  x{old_time / new_time:5.1f}  {status}")
+    print(f"{'total':14s} ast {total_old:7.3f}s  scan {total_new:7.3f}s  x{total_old / total_new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_search.py
+# Title search latency: the old linear substring scan vs. model.TitleIndex,
+# on the bundled catalog and on a synthetic catalog 10x its size.
+# Run from the repository root: python benchmarks/bench_search.py
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model
+
+QUERIES = ["t", "the", "toy", "star wars", "godfather", "amelie", "matrx", "tiatnic", "lord of the rigns", "zzzz"]
+REPEAT = 50
+
+
+def linear_scan(titles, query, limit=10):
+    """What app.py did on every keystroke."""
+    return [title for title in titles if query.lower() in title.lower()][:limit]
+
+
+def synthetic_titles(titles, factor):
+    rng = random.Random(0)
+    suffixes = ["", " II", " Returns", " (Director's Cut)", ": The Beginning", " Reloaded", " Forever", " Origins"]
+    scaled = list(titles)
+    for copy in range(1, factor):
+        scaled.extend(f"{title}{rng.choice(suffixes)} {copy}" for title in titles)
+    return scaled
+
+
+def per_query_ms(fn):
+    timings = {}
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            fn(query)
+        timings[query] = (time.perf_counter() - start) / REPEAT * 1000
+    return timings
+
+
+def main():
+    base_titles = list(model.get_all_movies().keys())
+    for name, titles in [("bundled", base_titles), ("10x synthetic", synthetic_titles(base_titles, 10))]:
+        start = time.perf_counter()
+        index = model.TitleIndex(titles)
+        build = time.perf_counter() - start
+        scan = per_query_ms(lambda q: linear_scan(titles, q))
+        indexed = per_query_ms(lambda q: index.search(q))
+        print(f"{name}: {len(titles)} titles, index built in {build:.2f}s")
+        for query in QUERIES:
+            print(f"  {query!r:22s} scan {scan[query]:7.3f} ms   index {indexed[query]:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
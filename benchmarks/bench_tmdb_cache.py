@@ -0,0 +1,54 @@
+# benchmarks/bench_tmdb_cache.py
+# Renders the poster details of a few app "pages" against a local stub TMDb server:
+# one call per poster without the cache vs. get_movie_details_many with a cold and a warm cache.
+# Run from the repository root: python benchmarks/bench_tmdb_cache.py
+
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils
+from tmdb_stub import StubTMDbServer
+
+
+def main():
+    server = StubTMDbServer(latency=0.05).start()
+    utils.TMDB_BASE_URL = server.base_url
+    utils.TMDB_API_KEY = utils.TMDB_API_KEY or "stub-key"
+    utils.TMDB_CACHE_PATH = os.path.join(tempfile.mkdtemp(), "tmdb_cache.sqlite")
+
+    # 3 reruns of a page with 10 search results, 10 popular movies and 5 recommendations
+    page = list(range(100, 125))
+    reruns = 3
+
+    utils.clear_cache()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        for tmdb_id in page:
+            # What get_movie_details used to do for every poster
+            requests.get(f"{server.base_url}/movie/{tmdb_id}?api_key={utils.TMDB_API_KEY}&language=en-US").json()
+    print(f"uncached, one by one:   {time.perf_counter() - start:6.3f}s  ({server.requests_served} requests)")
+
+    served = server.requests_served
+    start = time.perf_counter()
+    for _ in range(reruns):
+        utils.get_movie_details_many(page)
+    print(f"cached bulk:            {time.perf_counter() - start:6.3f}s  ({server.requests_served - served} requests)")
+
+    # A new process only has the on-disk layer
+    utils._memory_cache.clear()
+    served = server.requests_served
+    start = time.perf_counter()
+    utils.get_movie_details_many(page)
+    print(f"disk cache only:        {time.perf_counter() - start:6.3f}s  ({server.requests_served - served} requests)")
+    print(f"stats: {utils.get_cache_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
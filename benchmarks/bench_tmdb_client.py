@@ -0,0 +1,75 @@
+# benchmarks/bench_tmdb_client.py
+# Many sessions asking for the same popular movies at once, against a rate-limited stub TMDb server:
+# independent blocking requests (the old get_movie_details) vs. the shared AsyncTMDBClient.
+# Run from the repository root: python benchmarks/bench_tmdb_client.py
+
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tmdb_client import AsyncTMDBClient
+from tmdb_stub import StubTMDbServer
+
+SESSIONS = 40 # concurrent users
+PAGE = 25 # posters per page
+POPULAR = 60 # ids the pages are drawn from
+RATE_LIMIT = 40 # requests per second allowed by the stub
+
+
+def make_pages():
+    rng = random.Random(0)
+    return [rng.sample(range(1000, 1000 + POPULAR), PAGE) for _ in range(SESSIONS)]
+
+
+def run_blocking(server, pages):
+    def render(page):
+        ok = 0
+        for tmdb_id in page:
+            try:
+                response = requests.get(f"{server.base_url}/movie/{tmdb_id}", timeout=10)
+                response.raise_for_status()
+                ok += 1
+            except requests.exceptions.RequestException:
+                pass
+        return ok
+
+    with ThreadPoolExecutor(max_workers=SESSIONS) as pool:
+        return sum(pool.map(render, pages))
+
+
+async def run_async(server, pages):
+    client = AsyncTMDBClient("stub-key", base_url=server.base_url, rate_limit=RATE_LIMIT * 0.9, backoff=0.2)
+    results = await asyncio.gather(*(client.get_movies(page) for page in pages))
+    client.close()
+    return sum(data is not None for page in results for data in page), client.stats
+
+
+def main():
+    pages = make_pages()
+    total = SESSIONS * PAGE
+
+    server = StubTMDbServer(latency=0.02, rate_limit=RATE_LIMIT).start()
+    start = time.perf_counter()
+    ok = run_blocking(server, pages)
+    print(f"blocking, independent: {time.perf_counter() - start:6.2f}s  {ok}/{total} ok  "
+          f"{server.requests_served} requests, {server.rate_limited} rate limited")
+    server.shutdown()
+
+    server = StubTMDbServer(latency=0.02, rate_limit=RATE_LIMIT).start()
+    start = time.perf_counter()
+    ok, stats = asyncio.run(run_async(server, pages))
+    print(f"async client:          {time.perf_counter() - start:6.2f}s  {ok}/{total} ok  "
+          f"{server.requests_served} requests, {server.rate_limited} rate limited")
+    print(f"  client stats: {stats}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
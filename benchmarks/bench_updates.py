@@ -0,0 +1,40 @@
+# benchmarks/bench_updates.py
+# Times add_movies/remove_movies on the loaded catalog against rebuilding the whole model.
+# Run from the repository root: python benchmarks/bench_updates.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    merged = model.read_catalog()
+    model.REFIT_FRACTION = 1.0 # measure the incremental path only
+
+    _, rebuild = timed(lambda: model._fit_model(model.prepare_movies(merged)))
+    print(f"full rebuild ({len(model.movies)} movies): {rebuild:7.3f}s")
+
+    for n in (1, 10, 100, 500):
+        batch = merged.sample(n, random_state=n)
+        # Remove them first so the add below is a real insert, not a replacement
+        removed, remove_time = timed(lambda: model.remove_movies(tmdb_ids=batch['id']))
+        added, add_time = timed(lambda: model.add_movies(batch))
+        print(f"{n:4d} movies: remove {remove_time:7.3f}s ({removed} rows)  add {add_time:7.3f}s ({added} rows)"
+              f"  vs rebuild x{rebuild / max(add_time, 1e-9):.0f} (add)")
+
+    _, refit = timed(model.refit_model)
+    print(f"refit after updates ({len(model.movies)} movies): {refit:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/load_test.py
+# Local load test for server.py: starts the service (or uses --url), hammers /recommend from
+# several keep-alive client threads and reports latency percentiles and throughput.
+# Run from the repository root: python benchmarks/load_test.py [--workers 2] [--clients 16] [--seconds 10]
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOODS = ["Happy", "Sad", "Excited", "Romantic", "Curious", "Dark", "Calm"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_json(conn, path):
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def wait_until_up(host, port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            status, _ = get_json(conn, "/health")
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on {host}:{port} did not come up")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else float('nan')
+
+
+def client(host, port, paths, hot, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    rng = random.Random(threading.get_ident())
+    while time.monotonic() < stop_at:
+        # Half the traffic goes to a few hot requests, the rest is spread over all of them
+        path = paths[rng.randrange(hot if rng.random() < 0.5 else len(paths))]
+        start = time.perf_counter()
+        try:
+            status, _ = get_json(conn, path)
+        except (OSError, http.client.HTTPException, ValueError):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            status = None
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help="test a running server instead of starting one")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--requests', type=int, default=5000, help="distinct requests to draw from")
+    parser.add_argument('--hot', type=int, default=50, help="number of hot requests")
+    parser.add_argument('--cache-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        host, port = urlsplit(args.url).hostname, urlsplit(args.url).port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port), "--workers", str(args.workers),
+             "--cache-size", str(args.cache_size), "--quiet"],
+            cwd=ROOT,
+        )
+    try:
+        wait_until_up(host, port)
+        conn = http.client.HTTPConnection(host, port)
+        _, titles = get_json(conn, "/movies")
+        _, genres = get_json(conn, "/genres")
+        conn.close()
+
+        rng = random.Random(0)
+        titles = sorted(titles)
+        paths = []
+        for _ in range(args.requests):
+            params = {'title': rng.choice(titles)}
+            if rng.random() < 0.3:
+                params['genre'] = rng.choice(genres)
+            if rng.random() < 0.3:
+                params['mood'] = rng.choice(MOODS)
+            paths.append("/recommend?" + urlencode(params))
+
+        latencies, errors = [], []
+        stop_at = time.monotonic() + args.seconds
+        threads = [threading.Thread(target=client, args=(host, port, paths, min(args.hot, len(paths)), stop_at, latencies, errors))
+                   for _ in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        ms = 1000
+        print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.1f}s "
+              f"({args.workers if server else '?'} workers): {len(latencies) / elapsed:.0f} req/s, {len(errors)} errors")
+        print(f"latency p50 {percentile(latencies, 50) * ms:.2f} ms  p90 {percentile(latencies, 90) * ms:.2f} ms  "
+              f"p99 {percentile(latencies, 99) * ms:.2f} ms  max {max(latencies) * ms:.2f} ms")
+        conn = http.client.HTTPConnection(host, port)
+        print("stats of one worker:", get_json(conn, "/stats")[1])
+        conn.close()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
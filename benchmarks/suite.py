@@ -0,0 +1,292 @@
+# benchmarks/suite.py
+# Benchmark suite for the recommender hot paths, with machine-readable results:
+#   load      CSV read, JSON extraction, soup build, TF-IDF fit, neighbor index, artifact load
+#   recommend single recommend() latency (uncached, cached, precomputed) and recommend_batch() throughput
+#   search    search_titles() latency
+#   facets    get_all_* getters and get_movie_details_many()
+#   tmdb      utils.get_movie_details / get_movie_details_many against the local stub TMDb server
+# Runs on the bundled data/ CSVs and on synthetically scaled catalogs (--scale), and writes JSON
+# (metric -> value, plus commit and environment) that --compare diffs against an earlier run.
+# Run from the repository root:
+#   python benchmarks/suite.py [--scale 1 5] [--groups load recommend] [--output results.json]
+#   python benchmarks/suite.py --compare benchmarks/results/old.json [--output ...]
+#   python benchmarks/suite.py --profile prof/   (extra cProfile pass per group, top functions printed)
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import model
+import utils
+from tmdb_stub import StubTMDbServer
+
+GROUPS = ['load', 'recommend', 'search', 'facets', 'tmdb']
+MOODS = ["Happy", "Sad", "Excited", "Romantic", "Curious", "Dark", "Calm"]
+SEARCH_QUERIES = ["t", "the", "toy", "star wars", "godfather", "amelie", "matrx", "tiatnic", "lord of the rigns", "zzzz"]
+REGRESSION_RATIO = 1.2 # --compare flags metrics that got this much slower
+
+
+def best_of(fn, repeat):
+    """Runs fn `repeat` times; returns (last result, fastest time in seconds)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def latencies_ms(fn, args):
+    """Calls fn(arg) for every arg; returns (p50, p95) in milliseconds."""
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 95))
+
+
+def scaled_catalog(merged, scale, seed=0):
+    """
+    The merged CSV rows repeated `scale` times under new ids and titles. Each copy gets the
+    keywords of other movies, so copies are not identical to the originals.
+    """
+    if scale <= 1:
+        return merged
+    rng = np.random.default_rng(seed)
+    ids = pd.to_numeric(merged['id'], errors='coerce')
+    step = int(ids.max()) + 1
+    copies = [merged]
+    for copy in range(1, scale):
+        copies.append(merged.assign(
+            id=ids + copy * step,
+            title=merged['title'].astype(str) + f" ({copy + 1})",
+            keywords=merged['keywords'].to_numpy()[rng.permutation(len(merged))],
+        ))
+    return pd.concat(copies, ignore_index=True)
+
+
+def bench_load(merged, scale, repeat):
+    results = {}
+    if scale <= 1:
+        _, results['read_csv_s'] = best_of(model.read_catalog, repeat)
+    ided = model._numeric_ids(merged.copy())
+    parsed, results['extract_s'] = best_of(lambda: model._parse_columns(ided), repeat)
+    prepared, results['soup_s'] = best_of(lambda: model._assemble_movies(parsed.copy()), repeat)
+    matrix, results['tfidf_s'] = best_of(lambda: TfidfVectorizer(stop_words='english').fit_transform(prepared['soup']), repeat)
+    _, results['neighbors_s'] = best_of(lambda: model.build_neighbors(matrix), 1 if scale > 1 else repeat)
+    results['build_total_s'] = sum(results[key] for key in ('extract_s', 'soup_s', 'tfidf_s', 'neighbors_s'))
+    results['movies'] = len(prepared)
+    results['terms'] = matrix.shape[1]
+
+    # Install the catalog for the other groups (not timed)
+    model._fit_model(prepared)
+    if scale <= 1:
+        # What a server start does: memory-map the saved artifact
+        data_hash = model.compute_data_hash()
+        if model.load_artifact(data_hash):
+            _, results['artifact_load_s'] = best_of(lambda: model.load_artifact(data_hash), repeat)
+    return results
+
+
+def request_sample(n, seed=0):
+    rng = random.Random(seed)
+    titles = sorted(model.get_all_movies())
+    genres = model.get_all_genres()
+    sample = []
+    for _ in range(n):
+        genre = rng.choice(genres) if genres and rng.random() < 0.3 else None
+        mood = rng.choice(MOODS) if rng.random() < 0.3 else None
+        sample.append((rng.choice(titles), genre, mood))
+    return sample
+
+
+def bench_recommend(repeat):
+    results = {}
+    sample = request_sample(500)
+    recommend = lambda request: model.recommend(request[0], genre=request[1], mood=request[2])
+    cache_size = model.RECOMMEND_CACHE_SIZE
+    try:
+        model.RECOMMEND_CACHE_SIZE = 0
+        model.clear_recommend_cache()
+        results['single_p50_ms'], results['single_p95_ms'] = latencies_ms(recommend, sample)
+        model.RECOMMEND_CACHE_SIZE = max(cache_size, len(sample))
+        latencies_ms(recommend, sample)
+        results['cached_p50_ms'], results['cached_p95_ms'] = latencies_ms(recommend, sample)
+        model.clear_recommend_cache()
+        titles = [request[0] for request in sample]
+        _, results['warm_500_s'] = best_of(lambda: model.warm_recommend_cache(titles), 1)
+        results['precomputed_p50_ms'], results['precomputed_p95_ms'] = latencies_ms(model.recommend, titles)
+    finally:
+        model.RECOMMEND_CACHE_SIZE = cache_size
+        model.clear_recommend_cache()
+    batch = request_sample(5000, seed=1)
+    _, elapsed = best_of(lambda: model.recommend_batch([r[0] for r in batch], genres=[r[1] for r in batch],
+                                                       moods=[r[2] for r in batch]), repeat)
+    results['batch_5000_s'] = elapsed
+    results['batch_per_s'] = len(batch) / elapsed
+    return results
+
+
+def bench_search(repeat):
+    results = {}
+    queries = SEARCH_QUERIES * 20
+    results['p50_ms'], results['p95_ms'] = latencies_ms(lambda query: model.search_titles(query), queries)
+    return results
+
+
+def bench_facets(repeat):
+    results = {}
+    for name, fn in (('all_movies', model.get_all_movies), ('all_actors', model.get_all_actors),
+                     ('all_directors', model.get_all_directors), ('all_genres', model.get_all_genres)):
+        _, elapsed = best_of(fn, repeat * 5)
+        results[f'{name}_ms'] = elapsed * 1000
+    titles = [request[0] for request in request_sample(25, seed=2)]
+    _, elapsed = best_of(lambda: model.get_movie_details_many(titles), repeat * 5)
+    results['details_many_25_ms'] = elapsed * 1000
+    _, elapsed = best_of(lambda: [model.get_movie_details_from_df(title) for title in titles], repeat * 5)
+    results['details_single_25_ms'] = elapsed * 1000
+    return results
+
+
+def bench_tmdb(repeat, latency=0.01):
+    results = {}
+    server = StubTMDbServer(latency=latency).start()
+    settings = (utils.TMDB_BASE_URL, utils.TMDB_API_KEY, utils.TMDB_CACHE_PATH)
+    utils.TMDB_BASE_URL = server.base_url
+    utils.TMDB_API_KEY = utils.TMDB_API_KEY or "stub-key"
+    utils.TMDB_CACHE_PATH = os.path.join(tempfile.mkdtemp(), "tmdb_cache.sqlite")
+    try:
+        page = list(range(100, 125)) # 10 search results, 10 popular movies, 5 recommendations
+        utils.clear_cache()
+        _, results['single_cold_s'] = best_of(lambda: utils.get_movie_details(99), 1)
+        _, results['single_warm_ms'] = best_of(lambda: utils.get_movie_details(99), repeat * 5)
+        results['single_warm_ms'] *= 1000
+        _, results['page_cold_s'] = best_of(lambda: utils.get_movie_details_many(page), 1)
+        _, results['page_warm_ms'] = best_of(lambda: utils.get_movie_details_many(page), repeat * 5)
+        results['page_warm_ms'] *= 1000
+        results['stub_latency_s'] = latency
+        results['stub_requests'] = server.requests_served
+    finally:
+        utils.clear_cache()
+        utils.TMDB_BASE_URL, utils.TMDB_API_KEY, utils.TMDB_CACHE_PATH = settings
+        server.shutdown()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'neighbor_backend': model.NEIGHBOR_BACKEND,
+        'build_jobs': model.BUILD_JOBS,
+    }
+
+
+def compare(old, new):
+    """Prints the metrics both runs have, with new/old ratios; returns the regressed ones."""
+    regressions = []
+    for scale, metrics in new['results'].items():
+        for name, value in metrics.items():
+            before = old.get('results', {}).get(scale, {}).get(name)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            ratio = value / before
+            # Throughput metrics are better when higher, everything timed is better when lower
+            slower = ratio < 1 / REGRESSION_RATIO if name.endswith('_per_s') else ratio > REGRESSION_RATIO
+            timed = name.endswith(('_s', '_ms'))
+            flag = "  << slower" if slower and (timed or name.endswith('_per_s')) else ""
+            print(f"{scale:>4s} {name:28s} {before:12.4f} -> {value:12.4f}  x{ratio:5.2f}{flag}")
+            if flag:
+                regressions.append(f"{scale}/{name}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommender benchmark suite")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help="catalog sizes, as multiples of data/")
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=GROUPS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--profile', help="directory for cProfile stats, one file per scale and group")
+    args = parser.parse_args()
+
+    merged = model.read_catalog()
+    run = {'environment': environment(), 'args': vars(args), 'results': {}}
+    benches = {
+        'recommend': bench_recommend,
+        'search': bench_search,
+        'facets': bench_facets,
+        'tmdb': bench_tmdb,
+    }
+    for scale in args.scale:
+        label = f"x{scale}"
+        results = run['results'][label] = {}
+        catalog = scaled_catalog(merged, scale)
+        # The load group also installs the scaled catalog the other groups run on
+        groups = ['load'] + [group for group in args.groups if group != 'load']
+        for group in groups:
+            if group == 'tmdb' and scale > 1:
+                continue # doesn't depend on the catalog
+            run_group = (lambda: bench_load(catalog, scale, args.repeat)) if group == 'load' else \
+                (lambda: benches[group](args.repeat))
+            metrics = run_group()
+            if args.profile and group in args.groups:
+                # A second, untimed pass: the profiler's overhead would skew the results
+                profiler = cProfile.Profile()
+                profiler.runcall(run_group)
+                os.makedirs(args.profile, exist_ok=True)
+                path = os.path.join(args.profile, f"{label}-{group}.prof")
+                profiler.dump_stats(path)
+                print(f"--- {label} {group} profile ({path}), top functions by cumulative time")
+                pstats.Stats(profiler).sort_stats('cumulative').print_stats(12)
+            if group in args.groups:
+                results.update({f"{group}.{name}": value for name, value in metrics.items()})
+                for name, value in metrics.items():
+                    print(f"{label:>4s} {group + '.' + name:28s} {value:12.4f}")
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{run['environment']['commit'] or 'run'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), run)
+        print(f"{len(regressions)} regression(s)" + (f": {', '.join(regressions)}" if regressions else ""))
+
+
+if __name__ == "__main__":
+    main()
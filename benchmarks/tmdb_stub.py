@@ -0,0 +1,85 @@
+# benchmarks/tmdb_stub.py
+# A local stand-in for the TMDb /movie/{id} endpoint, used by the TMDb benchmarks.
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_MOVIE_PATH = re.compile(r"^/3/movie/(\d+)")
+
+
+class StubTMDbServer(ThreadingHTTPServer):
+    """
+    Serves fake movie details after `latency` seconds.
+    Every `fail_every`-th request answers with `fail_status` (0 disables failures).
+    More than `rate_limit` requests within one second are answered with 429 (None disables it).
+    `requests_served` counts all requests that reached the server.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.05, fail_every=0, fail_status=503, rate_limit=None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.fail_status = fail_status
+        self.rate_limit = rate_limit
+        self.requests_served = 0
+        self.rate_limited = 0
+        self._window = (0, 0) # (second, requests in that second)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/3"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            server.requests_served += 1
+            count = server.requests_served
+            second = int(time.monotonic())
+            in_window = server._window[1] + 1 if server._window[0] == second else 1
+            server._window = (second, in_window)
+            limited = server.rate_limit is not None and in_window > server.rate_limit
+            if limited:
+                server.rate_limited += 1
+        time.sleep(server.latency)
+
+        match = _MOVIE_PATH.match(self.path)
+        if limited:
+            status, body = 429, {"status_message": "rate limit exceeded"}
+        elif not match:
+            status, body = 404, {"status_message": "not found"}
+        elif server.fail_every and count % server.fail_every == 0:
+            status, body = server.fail_status, {"status_message": "stub failure"}
+        else:
+            tmdb_id = int(match.group(1))
+            status, body = 200, {
+                "id": tmdb_id,
+                "poster_path": f"/poster{tmdb_id}.jpg",
+                "vote_average": round(5 + (tmdb_id % 50) / 10, 1),
+                "tagline": f"Tagline of movie {tmdb_id}",
+            }
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
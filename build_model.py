@@ -0,0 +1,23 @@
+# build_model.py
+# Offline build step: parses the CSVs in data/, fits TF-IDF, computes the neighbor index and
+# writes the model artifact that model.py memory-maps at startup.
+# Usage: python build_model.py [--force]
+
+import sys
+import time
+
+import model
+
+
+def main():
+    start = time.perf_counter()
+    data_hash = model.compute_data_hash()
+    if '--force' in sys.argv[1:] or not model.load_artifact(data_hash):
+        model.load_data(rebuild=True)
+    print(f"Model artifact {model.ARTIFACT_DIR}/{data_hash} ready: "
+          f"{len(model.movies)} movies, {model.soup_matrix.shape[1]} terms "
+          f"({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
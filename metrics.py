@@ -0,0 +1,261 @@
+# metrics.py
+# Opt-in instrumentation: per-phase timers for load_data, per-call latency histograms
+# (recommend, detail lookups, TMDb fetches) and counters, readable as a snapshot dict or as
+# Prometheus text. Off unless METRICS_ENABLED=1 (or enable() is called); while off, the timers
+# and decorators only check a flag.
+# Set METRICS_ENABLED (or call enable()) before the first model call to get the load_data
+# phases of the initial load.
+
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+NAMESPACE = "recommender"
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_histograms = {}  # name -> Histogram
+_counters = {}    # name -> number
+_gauges = {}      # (name, labels) -> number, labels as a tuple of (key, value)
+_collectors = []  # functions returning {name: value}, read at snapshot time
+_http_server = None
+
+
+class Histogram:
+    """Counts of observations per bucket (not cumulative), plus their count, sum and max."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    """Context manager observing its duration into a histogram, or setting a phase gauge."""
+
+    def __init__(self, name, phase=False):
+        self.name = name
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.phase:
+            set_gauge('load_phase_seconds', elapsed, phase=self.name)
+        else:
+            observe(self.name, elapsed)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable(enabled=True):
+    global ENABLED
+    ENABLED = enabled
+
+
+def observe(name, seconds):
+    """Adds one observation (in seconds) to histogram `name`."""
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name, n=1):
+    """Adds n to counter `name` (by convention ending in _total)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def set_gauge(name, value, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[(name, tuple(sorted(labels.items())))] = value
+
+
+def timer(name):
+    """`with timer('x_seconds'):` observes the block's duration into histogram x_seconds."""
+    return _Timer(name) if ENABLED else _NULL_TIMER
+
+
+def phase(name):
+    """`with phase('tfidf'):` records the block's duration as load_phase_seconds{phase="tfidf"}."""
+    return _Timer(name, phase=True) if ENABLED else _NULL_TIMER
+
+
+def timed(name):
+    """Decorator: observes every call's duration into histogram `name`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def register_collector(fn):
+    """
+    Registers a function returning {name: value} that is read at snapshot time, for stats
+    kept elsewhere (cache hits, client counters). Names ending in _total are counters.
+    """
+    if fn not in _collectors:
+        _collectors.append(fn)
+    return fn
+
+
+def _collected():
+    values = {}
+    for collector in _collectors:
+        try:
+            values.update(collector())
+        except Exception as e:
+            print(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+    return values
+
+
+def snapshot():
+    """All metrics as a dict: histograms (count/sum/mean/max/p50/p95/p99, buckets), counters, gauges."""
+    with _lock:
+        histograms = {
+            name: {
+                'count': h.count,
+                'sum': h.sum,
+                'mean': h.sum / h.count if h.count else 0.0,
+                'max': h.max,
+                'p50': h.quantile(0.5),
+                'p95': h.quantile(0.95),
+                'p99': h.quantile(0.99),
+                'buckets': {str(bound): count for bound, count in zip(h.buckets + ('+Inf',), h.counts)},
+            }
+            for name, h in _histograms.items()
+        }
+        counters = dict(_counters)
+        gauges = {}
+        for (name, labels), value in _gauges.items():
+            key = name + ('{' + ','.join(f'{k}={v}' for k, v in labels) + '}' if labels else '')
+            gauges[key] = value
+    for name, value in _collected().items():
+        (counters if name.endswith('_total') else gauges)[name] = value
+    return {'enabled': ENABLED, 'histograms': histograms, 'counters': counters, 'gauges': gauges}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def _label_text(labels):
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}' if labels else ''
+
+
+def prometheus_text():
+    """The metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, h in sorted(_histograms.items()):
+            metric = f"{NAMESPACE}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(h.buckets + ('+Inf',), h.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {h.sum}")
+            lines.append(f"{metric}_count {h.count}")
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+    for name, value in _collected().items():
+        if name.endswith('_total'):
+            counters[name] = value
+        else:
+            gauges[(name, ())] = value
+    for name, value in sorted(counters.items()):
+        lines.append(f"# TYPE {NAMESPACE}_{name} counter")
+        lines.append(f"{NAMESPACE}_{name} {value}")
+    typed = set()
+    for (name, labels), value in sorted(gauges.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {NAMESPACE}_{name} gauge")
+            typed.add(name)
+        lines.append(f"{NAMESPACE}_{name}{_label_text(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """
+    Serves prometheus_text() on http://host:port/metrics from a daemon thread (for processes
+    without their own HTTP server, like the Streamlit app). Only the first call starts it.
+    """
+    global _http_server
+    with _lock:
+        if _http_server is None:
+            _http_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _http_server.daemon_threads = True
+            threading.Thread(target=_http_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _http_server
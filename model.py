@@ -3,21 +3,178 @@
 import pandas as pd
 import numpy as np
 import ast
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import bisect
+import difflib
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import shutil
+import sys
+import threading
+import time
+import unicodedata
+import scipy.sparse as sp
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+# scikit-learn is imported in the functions that fit or compare vectors: serving from a saved
+# artifact doesn't need it, and importing it takes longer than loading the artifact
 
-# These will be set in load_data()
-movies = None
-cos_sim = None
-title_to_index = None
-title_to_tmdb_id = None
+import metrics
+
+# These will be set in load_data(), on first use (see ensure_loaded) or from a background
+# thread (see load_in_background); importing this module doesn't load anything
+movies = None            # tmdb_id and title per movie; the facets below are stored encoded
+movie_actors = None      # EncodedLists: top actors per movie
+movie_genres = None      # EncodedLists: genre words per movie
+movie_directors = None   # EncodedLists: the director of each movie ('' if unknown)
+neighbor_indices = None  # (n_movies, NEIGHBORS_K) int32, most similar first
+neighbor_scores = None   # (n_movies, NEIGHBORS_K) float32 cosine scores, same layout
+neighbor_stats = None
+soup_matrix = None       # sparse TF-IDF matrix, one row per movie
+tfidf_vocabulary = None  # term -> column of soup_matrix
+tfidf_idf = None
+title_to_index = None    # title -> row (of the first movie with that title)
+title_to_tmdb_id = None  # title -> tmdb_id, same movie
+title_search_index = None
+
+# Match columns derived from 'movies' (see _build_match_columns)
+_titles = None
+_tmdb_ids = None
+_actor_rows = None          # actor name -> int32 rows
+_director_rows = None       # lowercased director -> int32 rows
+_genre_token_rows = None    # lowercased genre word -> int32 rows
+_actor_vocab = None
+_director_vocab = None
+_genre_vocab = None
+_genre_masks = None
+_mood_masks = None
+_active = None              # False for rows removed since the last fit (see remove_movies)
+_title_rows = None          # title -> row of the first (lowest row) movie with that title
+_duplicate_title_rows = None  # title -> sorted rows, only for titles shared by several movies
+_NO_ROWS = np.empty(0, dtype=np.int32)
+_row_buffers = {}           # name -> preallocated array behind a per-row column (see _extended)
+
+# Incremental updates (add_movies/remove_movies) since the last fit. Once they exceed this
+# fraction of the catalog, TF-IDF is refit on the whole catalog (see refit_model).
+REFIT_FRACTION = 0.2
+_pending_updates = 0
+
+# get_recommendations results kept in memory (least recently used go first), 0 disables it
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", 4096))
+RECOMMEND_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", 0)) # seconds, 0 = until the model changes
+# Length of the unfiltered lists warm_recommend_cache precomputes, and how many titles keep one
+# (the least requested go first); they expire after RECOMMEND_CACHE_TTL too
+RECOMMEND_PRECOMPUTE_TOPN = 20
+RECOMMEND_PRECOMPUTE_TITLES = int(os.getenv("RECOMMEND_PRECOMPUTE_TITLES", 500))
+
+# Worker processes used to parse the CSVs and build the neighbor index (1 = no process pool).
+# Opt-in, for offline builds (BUILD_JOBS=4 python build_model.py): the pool is forked, and
+# forking a multi-threaded process such as the app's background load can deadlock the workers
+BUILD_JOBS = int(os.getenv("BUILD_JOBS", 1))
+# Rows of the merged CSVs parsed per task when building with several processes
+PARSE_CHUNK_ROWS = 1000
+# When > 0, build_model streams the credits and keywords CSVs this many rows at a time and
+# reduces each chunk right away (see stream_catalog), instead of reading them whole
+STREAM_CSV_CHUNK_ROWS = int(os.getenv("STREAM_CSV_CHUNK_ROWS", 0))
+
+# Number of nearest neighbors kept per movie (the movie itself is usually the first one)
+NEIGHBORS_K = 50
+# Upper bound for the dense similarity block computed at once while building neighbors
+NEIGHBOR_BLOCK_BYTES = 32 * 1024 * 1024
+# How the neighbor index is built: 'exact' compares every pair of movies, 'ivf' only compares
+# movies in nearby clusters (approximate, for large catalogs; see build_neighbors_ivf)
+NEIGHBOR_BACKEND = os.getenv("NEIGHBOR_BACKEND", "exact")
+IVF_N_PROBE = int(os.getenv("IVF_N_PROBE", 4))               # clusters searched per movie
+IVF_MAX_POSTINGS = int(os.getenv("IVF_MAX_POSTINGS", 250))   # terms in at most this many movies count as rare
+IVF_COMPONENTS = int(os.getenv("IVF_COMPONENTS", 64))        # SVD dimensions used for clustering
+
+# Genres that get a boost for each mood
+MOOD_GENRE_MAP = {
+    'happy': ['comedy', 'adventure', 'family'],
+    'sad': ['drama', 'romance'],
+    'excited': ['action', 'sci-fi', 'adventure'],
+    'romantic': ['romance', 'drama'],
+    'curious': ['mystery', 'documentary'],
+    'dark': ['thriller', 'horror', 'crime'],
+    'calm': ['documentary', 'drama', 'history']
+}
+
+# Input CSVs and the persisted model built from them (see build_model.py)
+DATA_FILES = ("data/clean_metadata.csv", "data/trimmed_credits.csv", "data/clean_keywords.csv")
+ARTIFACT_DIR = "model_artifact"
+# Bump whenever the preprocessing or the artifact layout changes so old artifacts get rebuilt
+ARTIFACT_VERSION = 2
+
+# Field scanners for the Python-literal JSON columns (lists of flat dicts).
+# The quick scanners look for "'key': " at the start of a dict or after ", ". Only a string
+# holding a quote could fake that (say a character named "Bob, 'name': 'Fake'"), and Python
+# writes those double-quoted or with backslashes. Values with either go through the exact
+# scanners, which match every string literal as a whole so text inside one is skipped over.
+# A list the scanners find no "'key': " in (JSON with double-quoted keys, no space after the
+# colon) is parsed with ast like any other cell.
+_STRING_LITERAL = r"'[^'\\]*(?:\\.[^'\\]*)*'" + '|' + r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_NON_WORD = re.compile(r'[\W_]+')
+_DIRECTOR_JOB = re.compile(r"(?:\{|, )'job': 'Director'")
+# Exact crew scanner: '{' starts a member, groups 2/3 are the key/value of 'job' and 'name'
+_CREW_TOKEN = re.compile(rf"(\{{)|'(job|name)': ({_STRING_LITERAL})|{_STRING_LITERAL}")
+_field_patterns = {}
+
+def _needs_exact_scan(text):
+    return '"' in text or '\\' in text
+
+def _outside_quotes(text, pos):
+    """
+    Whether `pos` is outside the string literals of a quick-scan text: with no double quotes
+    and no escapes every quote opens or closes a literal, so the count before `pos` tells.
+    """
+    return text.count("'", 0, pos) % 2 == 0
+
+def _field_pattern(key, exact=False):
+    """
+    Returns (and caches) the regex capturing the string value of `key` in every dict, as group 1.
+    The exact one also matches every other string literal, with group 1 None.
+    """
+    pattern = _field_patterns.get((key, exact))
+    if pattern is None:
+        pattern = rf"(?:\{{|, )'{re.escape(key)}': ({_STRING_LITERAL})"
+        pattern = re.compile(pattern + f"|{_STRING_LITERAL}" if exact else pattern)
+        _field_patterns[(key, exact)] = pattern
+    return pattern
+
+def _unquote(literal):
+    """Turns a matched string literal into its value (escapes are rare, let ast handle them)."""
+    return ast.literal_eval(literal) if '\\' in literal else literal[1:-1]
+
+def _is_list_literal(value):
+    return isinstance(value, str) and value.startswith('[') and value.endswith(']')
 
 # Modified extract_names to return a list or string
 def extract_names(json_str, key='name', topn=None, as_list=False):
     """
     Extracts names from a JSON string (like 'genres', 'cast', 'keywords').
     Can return names as a list or a space-separated string.
+    Only the requested field is pulled out, the full object tree is never built.
+    Anything that doesn't look like a list literal goes through ast.
     """
+    if _is_list_literal(json_str):
+        pattern = _field_pattern(key, _needs_exact_scan(json_str))
+        if topn:
+            literals = []
+            for match in pattern.finditer(json_str):
+                if match.group(1):
+                    literals.append(match.group(1))
+                    if len(literals) == topn:
+                        break
+        else:
+            literals = [literal for literal in pattern.findall(json_str) if literal]
+        if literals or json_str == '[]':
+            names = [_unquote(literal) for literal in literals]
+            return names if as_list else ' '.join(names)
+
     try:
         items = ast.literal_eval(json_str)
         names = [item[key] for item in items]
@@ -25,13 +182,42 @@ def extract_names(json_str, key='name', topn=None, as_list=False):
             return names[:topn] if topn else names
         else:
             return ' '.join(names[:topn]) if topn else ' '.join(names)
-    except (ValueError, SyntaxError, TypeError): # Added TypeError for robustness
+    except (ValueError, SyntaxError, TypeError, KeyError): # Added TypeError for robustness
         return [] if as_list else ''
 
 def get_director(crew_str):
     """
     Extracts the director's name from the 'crew' JSON string.
+    Finds the first "'job': 'Director'" and reads the 'name' of that same crew member.
     """
+    if _is_list_literal(crew_str) and "'job': " in crew_str and not _needs_exact_scan(crew_str):
+        job = _DIRECTOR_JOB.search(crew_str)
+        if not job:
+            return ''
+        # The braces around the member, skipping any inside a string value
+        member_start = crew_str.rfind('{', 0, job.start() + 1)
+        while member_start > 0 and not _outside_quotes(crew_str, member_start):
+            member_start = crew_str.rfind('{', 0, member_start)
+        member_end = crew_str.find('}', job.end())
+        while member_end != -1 and not _outside_quotes(crew_str, member_end):
+            member_end = crew_str.find('}', member_end + 1)
+        name = _field_pattern('name').search(crew_str, member_start)
+        if name and (member_end == -1 or name.start() < member_end):
+            return _unquote(name.group(1))
+        return ''
+    if _is_list_literal(crew_str) and "'job': " in crew_str:
+        member = {}
+        for match in _CREW_TOKEN.finditer(crew_str):
+            if match.group(1):
+                if member.get('job') == 'Director':
+                    return '' # the first director has no name
+                member = {}
+            elif match.group(2):
+                member[match.group(2)] = _unquote(match.group(3))
+                if member.get('job') == 'Director' and 'name' in member:
+                    return member['name']
+        return ''
+
     try:
         crew = ast.literal_eval(crew_str)
         for member in crew:
@@ -41,181 +227,1698 @@ def get_director(crew_str):
     except (ValueError, SyntaxError, TypeError): # Added TypeError for robustness
         return ''
 
-def load_data():
+def extract_names_column(values, key='name', topn=None, as_list=False):
+    """Runs extract_names over a whole column in one pass and returns a list."""
+    return [extract_names(value, key, topn, as_list) for value in values]
+
+def get_director_column(values):
+    """Runs get_director over a whole 'crew' column in one pass and returns a list."""
+    return [get_director(value) for value in values]
+
+def _process_pool(n_jobs, initializer=None, initargs=()):
+    """
+    Process pool for build and batch work. Workers are forked where possible, so they share the
+    parent's pages and `initargs` reach them without being pickled.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    return ProcessPoolExecutor(max_workers=n_jobs, mp_context=context, initializer=initializer, initargs=initargs)
+
+_worker_data = None # what a pool worker was started with (see _init_worker)
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _parse_columns(frame):
+    """
+    Parses the raw JSON-literal columns of CSV rows, whichever of them `frame` has: 'genres'
+    and 'keywords' become space-separated names, 'cast' the list of the top 3 actors
+    ('top_actors_list') and 'crew' the 'director'. Other columns are kept as they are.
+    """
+    parsed = frame.drop(columns=[column for column in ('cast', 'crew') if column in frame])
+    for column in ('genres', 'keywords'):
+        if column in frame:
+            parsed[column] = extract_names_column(frame[column])
+    if 'cast' in frame:
+        parsed['top_actors_list'] = pd.Series(extract_names_column(frame['cast'], topn=3, as_list=True), index=frame.index, dtype=object)
+    if 'crew' in frame:
+        parsed['director'] = get_director_column(frame['crew'])
+    return parsed
+
+def _parse_chunk(bounds):
+    """Pool task: parses rows [start, stop) of the frame the worker was started with."""
+    start, stop = bounds
+    return _parse_columns(_worker_data.iloc[start:stop])
+
+def _top_k(block, k):
     """
-    Loads, merges, and preprocesses movie data for the recommender.
-    Initializes global 'movies' DataFrame, cosine similarity matrix, and mappings.
+    Top-k columns of each row of a dense similarity block, as (int32 indices, float32 scores).
+    Rows are ordered by score descending, ties broken by lower column index.
     """
-    global movies, cos_sim, title_to_index, title_to_tmdb_id
+    n = block.shape[1]
+    # Everything at or above the k-th largest score is a candidate (this keeps all ties),
+    # then sort candidates by (row, -score, column) and keep the first k of each row.
+    kth = np.partition(block, n - k, axis=1)[:, n - k]
+    rows, cols = np.nonzero(block >= kth[:, None])
+    vals = block[rows, cols]
+    order = np.lexsort((cols, -vals, rows))
+    rows, cols, vals = rows[order], cols[order], vals[order]
+    row_starts = np.searchsorted(rows, np.arange(block.shape[0]))
+    take = (row_starts[:, None] + np.arange(k)).ravel()
+    return cols[take].reshape(-1, k).astype(np.int32), vals[take].reshape(-1, k).astype(np.float32)
 
-    # Load data
+def _neighbor_block(soup_matrix, start, stop, k):
+    """Top-k neighbors of rows [start, stop), plus the size of the similarity block used."""
+    from sklearn.metrics.pairwise import cosine_similarity
+    block = cosine_similarity(soup_matrix[start:stop], soup_matrix)
+    return _top_k(block, k) + (block.nbytes,)
+
+def _neighbor_block_task(bounds):
+    """Pool task: _neighbor_block on the matrix the worker was started with."""
+    return _neighbor_block(_worker_data, *bounds)
+
+def build_neighbors(soup_matrix, k=NEIGHBORS_K, block_bytes=NEIGHBOR_BLOCK_BYTES, n_jobs=None):
+    """
+    Builds a top-k nearest-neighbor index from the (sparse) TF-IDF matrix.
+    Similarities are computed a block of rows at a time so the full N x N matrix never exists;
+    with n_jobs > 1 (default BUILD_JOBS) the blocks are spread over a process pool, each worker
+    holding one block at a time.
+    Rows are ordered by score descending, ties broken by lower movie index.
+    Returns (indices, scores, stats).
+    """
+    n = soup_matrix.shape[0]
+    k = min(k, n)
+    n_jobs = BUILD_JOBS if n_jobs is None else n_jobs
+    chunk_rows = max(1, min(n, block_bytes // max(1, n * 8)))
+    bounds = [(start, min(start + chunk_rows, n), k) for start in range(0, n, chunk_rows)]
+
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    peak_block_bytes = 0
+
+    if n_jobs > 1 and len(bounds) > 1:
+        with _process_pool(min(n_jobs, len(bounds)), _init_worker, (soup_matrix,)) as pool:
+            blocks = list(pool.map(_neighbor_block_task, bounds))
+    else:
+        blocks = (_neighbor_block(soup_matrix, *block_bounds) for block_bounds in bounds)
+    for (start, stop, _), (block_indices, block_scores, block_nbytes) in zip(bounds, blocks):
+        indices[start:stop], scores[start:stop] = block_indices, block_scores
+        peak_block_bytes = max(peak_block_bytes, block_nbytes)
+
+    stats = {
+        'backend': 'exact',
+        'n_movies': n,
+        'k': k,
+        'n_jobs': n_jobs if len(bounds) > 1 else 1,
+        'chunk_rows': chunk_rows,
+        'peak_block_bytes': peak_block_bytes,
+        'index_bytes': indices.nbytes + scores.nbytes,
+        'dense_matrix_bytes': n * n * 8,
+    }
+    return indices, scores, stats
+
+def _reduce_dimensions(soup_matrix, n_components, seed=0):
+    """Dense, l2-normalized float32 SVD projection of the TF-IDF rows (used to cluster movies)."""
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.preprocessing import normalize
+    n_components = min(n_components, soup_matrix.shape[1] - 1, soup_matrix.shape[0] - 1)
+    if n_components < 1:
+        reduced = soup_matrix.toarray()
+    else:
+        reduced = TruncatedSVD(n_components, random_state=seed).fit_transform(soup_matrix)
+    return normalize(reduced).astype(np.float32)
+
+def _spherical_kmeans(vectors, n_clusters, seed=0, n_iter=10, sample_per_cluster=256):
+    """
+    k-means on unit vectors with cosine similarity, trained on a sample of the rows.
+    Returns (centroids, labels of all rows).
+    """
+    from sklearn.preprocessing import normalize
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    train = vectors[rng.choice(n, min(n, n_clusters * sample_per_cluster), replace=False)]
+    centroids = train[rng.choice(len(train), n_clusters, replace=False)]
+
+    def assign(x):
+        # In chunks so the (rows x clusters) block stays small
+        step = max(1, NEIGHBOR_BLOCK_BYTES // (4 * n_clusters))
+        return np.concatenate([(x[i:i + step] @ centroids.T).argmax(axis=1) for i in range(0, len(x), step)])
+
+    for _ in range(n_iter):
+        labels = assign(train)
+        members = sp.csr_matrix((np.ones(len(train), dtype=np.float32), (labels, np.arange(len(train)))),
+                                shape=(n_clusters, len(train)))
+        sums = np.asarray(members @ train)
+        empty = np.flatnonzero(~sums.any(axis=1))
+        sums[empty] = train[rng.choice(len(train), len(empty), replace=False)]
+        centroids = normalize(sums).astype(np.float32)
+    return centroids, assign(vectors)
+
+def build_neighbors_ivf(soup_matrix, k=NEIGHBORS_K, n_lists=None, n_probe=None, max_postings=None,
+                        n_components=None, rows=None, pair_budget=2_000_000,
+                        block_bytes=NEIGHBOR_BLOCK_BYTES, seed=0):
+    """
+    Approximate top-k nearest-neighbor index for large catalogs. A movie is only compared with
+    - the movies of its n_probe closest clusters (IVF: ~sqrt(N) clusters, k-means on SVD-reduced
+      vectors), which catches neighbors that share broad terms like genres, and
+    - the movies sharing one of its rare terms (in at most max_postings movies: actors,
+      directors, specific keywords), which catches the neighbors clusters miss.
+    Scores of the compared pairs are exact cosine similarities. Raising n_probe or max_postings
+    raises recall and build time. Same output as build_neighbors: (indices, scores, stats);
+    with `rows`, only the lists of those movies are computed (one output row per entry).
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.preprocessing import normalize
+    n = soup_matrix.shape[0]
+    k = min(k, n)
+    n_lists = min(n, n_lists or max(1, int(round(np.sqrt(n)))))
+    n_probe = min(n_lists, n_probe or IVF_N_PROBE)
+    max_postings = max_postings or IVF_MAX_POSTINGS
+
+    started = time.perf_counter()
+    matrix = normalize(sp.csr_matrix(soup_matrix, dtype=np.float32))
+    reduced = _reduce_dimensions(matrix, n_components or IVF_COMPONENTS, seed)
+    centroids, labels = _spherical_kmeans(reduced, n_lists, seed)
+    members = np.argsort(labels, kind='stable').astype(np.int32)
+    list_starts = np.searchsorted(labels[members], np.arange(n_lists + 1))
+    list_sizes = np.diff(list_starts)
+
+    # Movie x rare-term incidence, for "shares a rare term" candidates
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    rare_terms = np.flatnonzero(document_frequency <= max_postings)
+    rare = matrix[:, rare_terms]
+    rare.data[:] = 1
+
+    index_seconds = time.perf_counter() - started
+
+    queries = np.arange(n) if rows is None else np.asarray(rows)
+    indices = np.empty((len(queries), k), dtype=np.int32)
+    scores = np.empty((len(queries), k), dtype=np.float32)
+    compared = 0
+    # Queries per chunk so the candidate pairs stay around pair_budget and the dense query rows
+    # within block_bytes
+    per_query = n_probe * n / n_lists + rare.nnz / n * max_postings
+    chunk_rows = max(1, int(min(pair_budget // max(1.0, per_query), block_bytes // (4 * matrix.shape[1]))))
+
+    for start in range(0, len(queries), chunk_rows):
+        out = np.arange(start, min(start + chunk_rows, len(queries)))
+        batch = queries[out]
+        probes = np.argpartition(-(reduced[batch] @ centroids.T), n_probe - 1, axis=1)[:, :n_probe].ravel()
+        # (query, candidate) pairs from the probed lists...
+        lengths = list_sizes[probes]
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        query_ids = np.repeat(np.repeat(np.arange(len(batch)), n_probe), lengths)
+        candidate_ids = members[np.repeat(list_starts[probes], lengths) + offsets]
+        # ...and from shared rare terms
+        shared = (rare[batch] @ rare.T).tocoo()
+        pairs = np.sort(np.concatenate([
+            query_ids.astype(np.int64) * n + candidate_ids,
+            shared.row.astype(np.int64) * n + shared.col,
+        ]))
+        pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+        query_ids, candidate_ids = pairs // n, (pairs % n).astype(np.int32)
+        # Exact dot products: each candidate's stored terms against its query's dense row
+        dense_queries = matrix[batch].toarray()
+        candidates = matrix[candidate_ids]
+        entry_lengths = np.diff(candidates.indptr)
+        entries = np.repeat(query_ids * dense_queries.shape[1], entry_lengths) + candidates.indices
+        products = np.append(candidates.data * dense_queries.ravel()[entries], np.float32(0))
+        pair_scores = np.add.reduceat(products, candidates.indptr[:-1])
+        pair_scores[entry_lengths == 0] = 0
+        compared += len(pairs)
+
+        # Top k per query: score descending, ties broken by lower movie index (as in _top_k).
+        # Pairs are sorted by (query, candidate), so one stable sort on query - score does it.
+        order = np.argsort(query_ids * 4.0 - pair_scores, kind='stable')
+        counts = np.bincount(query_ids, minlength=len(batch))
+        row_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        full = counts >= k
+        take = order[(row_starts[full][:, None] + np.arange(k)).ravel()]
+        indices[out[full]] = candidate_ids[take].reshape(-1, k)
+        scores[out[full]] = pair_scores[take].reshape(-1, k)
+        if not full.all():
+            # Too few candidates (tiny clusters, no rare terms): compare with everything
+            short = out[~full]
+            indices[short], scores[short] = _top_k(cosine_similarity(soup_matrix[batch[~full]], soup_matrix), k)
+            compared += len(short) * n
+
+    stats = {
+        'backend': 'ivf',
+        'n_movies': n,
+        'k': k,
+        'n_lists': n_lists,
+        'n_probe': n_probe,
+        'max_postings': max_postings,
+        'rare_terms': len(rare_terms),
+        'mean_compared': compared / max(1, len(queries)),
+        'chunk_rows': chunk_rows,
+        'index_seconds': index_seconds,
+        'query_seconds': time.perf_counter() - started - index_seconds,
+        'index_bytes': indices.nbytes + scores.nbytes,
+        'dense_matrix_bytes': n * n * 8,
+    }
+    return indices, scores, stats
+
+# Selectable with NEIGHBOR_BACKEND (see _fit_model)
+NEIGHBOR_BACKENDS = {
+    'exact': build_neighbors,
+    'ivf': build_neighbors_ivf,
+}
+
+def compute_data_hash(paths=DATA_FILES):
+    """
+    Hashes the input CSVs (and the artifact format version and neighbor backend) to key the
+    persisted model. Raises FileNotFoundError if any of the files is missing.
+    """
+    digest = hashlib.sha256(f"artifact-v{ARTIFACT_VERSION}".encode())
+    if NEIGHBOR_BACKEND != 'exact':
+        digest.update(f"{NEIGHBOR_BACKEND}-{IVF_N_PROBE}-{IVF_MAX_POSTINGS}-{IVF_COMPONENTS}".encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def save_artifact(data_hash, artifact_dir=ARTIFACT_DIR):
+    """
+    Writes the current model (movies frame, TF-IDF vocabulary/idf, sparse matrix, neighbors)
+    to artifact_dir/<data_hash>/. Older artifacts in artifact_dir are removed.
+    """
+    target = os.path.join(artifact_dir, data_hash)
+    tmp = f"{target}.tmp-{os.getpid()}"
     try:
-        metadata = pd.read_csv("data/clean_metadata.csv")
-        credits = pd.read_csv("data/trimmed_credits.csv")
-        keywords = pd.read_csv("data/clean_keywords.csv")
-    except FileNotFoundError as e:
-        print(f"Error loading data files: {e}. Make sure 'data/' directory contains the CSVs.")
-        # Create empty DataFrames to avoid further errors and allow app to start
-        # Use dummy values that won't cause immediate issues.
-        movies = pd.DataFrame({'id': [0], 'title': ["Error Loading Data"], 'soup': ["dummy"], 'genres': ["dummy"], 'director': ["dummy"], 'top_actors_list': [[]]})
-        cos_sim = np.array([[0.0]]) # Initialize with a dummy similarity
-        title_to_index = pd.Series([0], index=["Dummy Movie"])
-        title_to_tmdb_id = pd.Series([0], index=["Dummy Movie"])
+        os.makedirs(tmp, exist_ok=True)
+        movies.to_pickle(os.path.join(tmp, 'movies.pkl'))
+        for name, lists in (('actors', movie_actors), ('genres', movie_genres), ('directors', movie_directors)):
+            lists.save(tmp, name)
+        with open(os.path.join(tmp, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(tfidf_vocabulary, f)
+        np.save(os.path.join(tmp, 'idf.npy'), tfidf_idf)
+        np.save(os.path.join(tmp, 'soup_data.npy'), soup_matrix.data)
+        np.save(os.path.join(tmp, 'soup_indices.npy'), soup_matrix.indices)
+        np.save(os.path.join(tmp, 'soup_indptr.npy'), soup_matrix.indptr)
+        np.save(os.path.join(tmp, 'neighbor_indices.npy'), neighbor_indices)
+        np.save(os.path.join(tmp, 'neighbor_scores.npy'), neighbor_scores)
+        # The manifest is written last, an artifact without one is never loaded
+        with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': ARTIFACT_VERSION,
+                'data_hash': data_hash,
+                'soup_shape': list(soup_matrix.shape),
+                'neighbor_stats': neighbor_stats,
+            }, f)
+
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.rename(tmp, target)
+        for name in os.listdir(artifact_dir):
+            path = os.path.join(artifact_dir, name)
+            if name != data_hash and os.path.isdir(path) and '.tmp-' not in name:
+                shutil.rmtree(path, ignore_errors=True)
+    except OSError as e:
+        print(f"Could not save model artifact to '{target}': {e}")
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def load_artifact(data_hash=None, artifact_dir=ARTIFACT_DIR):
+    """
+    Loads a persisted model from artifact_dir. Arrays are memory-mapped read-only so that
+    several worker processes share the same pages.
+    With data_hash=None the newest complete artifact is used (e.g. when the CSVs are not deployed).
+    Returns True on success, False if no matching artifact exists.
+    """
+    global movies, movie_actors, movie_genres, movie_directors, soup_matrix, tfidf_vocabulary, tfidf_idf
+    global neighbor_indices, neighbor_scores, neighbor_stats
+
+    if data_hash is None:
+        candidates = []
+        if os.path.isdir(artifact_dir):
+            for name in os.listdir(artifact_dir):
+                manifest_path = os.path.join(artifact_dir, name, 'manifest.json')
+                if os.path.isfile(manifest_path):
+                    candidates.append((os.path.getmtime(manifest_path), name))
+        if not candidates:
+            return False
+        data_hash = max(candidates)[1]
+
+    path = os.path.join(artifact_dir, data_hash)
+    if not os.path.isfile(os.path.join(path, 'manifest.json')):
+        return False
+    try:
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != ARTIFACT_VERSION or manifest.get('data_hash') != data_hash:
+            return False
+
+        def load_array(name):
+            return np.load(os.path.join(path, name), mmap_mode='r')
+
+        with metrics.phase('artifact_read'):
+            loaded_movies = pd.read_pickle(os.path.join(path, 'movies.pkl'))
+            loaded_lists = [EncodedLists.load(path, name) for name in ('actors', 'genres', 'directors')]
+            with open(os.path.join(path, 'vocabulary.json'), encoding='utf-8') as f:
+                loaded_vocabulary = json.load(f)
+            loaded_matrix = sp.csr_matrix(
+                (load_array('soup_data.npy'), load_array('soup_indices.npy'), load_array('soup_indptr.npy')),
+                shape=tuple(manifest['soup_shape']), copy=False,
+            )
+            loaded_idf = load_array('idf.npy')
+            loaded_indices = load_array('neighbor_indices.npy')
+            loaded_scores = load_array('neighbor_scores.npy')
+    except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError,
+            AttributeError, TypeError, ImportError) as e:
+        # A truncated movies.pkl, or one pickled by a pandas this one can't read (the data hash
+        # doesn't cover library versions): rebuild instead
+        print(f"Could not load model artifact from '{path}': {e!r}")
+        return False
+
+    movies = loaded_movies
+    movie_actors, movie_genres, movie_directors = loaded_lists
+    soup_matrix = loaded_matrix
+    tfidf_vocabulary = loaded_vocabulary
+    tfidf_idf = loaded_idf
+    neighbor_indices = loaded_indices
+    neighbor_scores = loaded_scores
+    neighbor_stats = manifest.get('neighbor_stats')
+    _build_lookups()
+    return True
+
+def _extended(buffers, name, array, new):
+    """
+    `array` with `new` appended along the first axis, as a view of buffers[name]: a buffer with
+    room to spare (a quarter of its size) that `array` already starts if it was returned from
+    here. Appending then writes only the new rows, the copy into a bigger buffer happens once
+    every so many appends. The first fill of an empty array is allocated exactly.
+    """
+    n, total = len(array), len(array) + len(new)
+    buffer = buffers.get(name)
+    if buffer is None or array.base is not buffer or len(buffer) < total:
+        buffer = np.empty((total + total // 4 + 16 if n else total,) + array.shape[1:], dtype=array.dtype)
+        buffer[:n] = array
+        buffers[name] = buffer
+    buffer[n:total] = new
+    return buffer[:total]
+
+class EncodedLists:
+    """
+    Per-movie lists of names (top actors, genre words, directors), dictionary-encoded: `names`
+    holds every distinct name once, `ids` the int32 name ids of all movies back to back, and
+    movie i owns ids[offsets[i]:offsets[i + 1]] (CSR layout). Keeps the facet columns out of
+    per-row Python lists and strings, and ids/offsets memory-map from the artifact.
+    """
+
+    def __init__(self, names, ids, offsets):
+        self.names = names      # object array of str
+        self.ids = ids          # int32
+        self.offsets = offsets  # int64, len(movies) + 1
+        self._codes = None      # name -> id, built when extending
+        self._buffers = {}      # room to extend the arrays in place (see _extended)
+
+    @classmethod
+    def from_lists(cls, lists):
+        encoded = cls(np.empty(0, dtype=object), np.empty(0, dtype=np.int32), np.zeros(1, dtype=np.int64))
+        encoded.extend(lists)
+        return encoded
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, row):
+        """The names of one movie, as a list."""
+        return self.names[self.ids[self.offsets[row]:self.offsets[row + 1]]].tolist()
+
+    def used_names(self):
+        return self.names[np.unique(self.ids)].tolist()
+
+    def extend(self, lists):
+        """Appends one list of names per new movie."""
+        if self._codes is None:
+            self._codes = {name: code for code, name in enumerate(self.names)}
+        new_names, new_ids, lengths = [], [], []
+        for values in lists:
+            for name in values:
+                code = self._codes.get(name)
+                if code is None:
+                    code = self._codes[name] = len(self._codes)
+                    new_names.append(name)
+                new_ids.append(code)
+            lengths.append(len(values))
+        names = np.empty(len(new_names), dtype=object)
+        names[:] = new_names
+        offsets = self.offsets[-1] + np.cumsum(lengths, dtype=np.int64)
+        self.names = _extended(self._buffers, 'names', self.names, names)
+        self.ids = _extended(self._buffers, 'ids', self.ids, np.array(new_ids, dtype=np.int32))
+        self.offsets = _extended(self._buffers, 'offsets', self.offsets, offsets)
+
+    def get_many(self, rows):
+        """The names of several movies from one gather, as a list of lists."""
+        ids, offsets = self._gather(rows)
+        names = self.names[ids].tolist()
+        bounds = offsets.tolist()
+        return [names[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def take(self, rows):
+        """A new EncodedLists with only `rows`, in that order; unused names are dropped."""
+        ids, offsets = self._gather(rows)
+        used, ids = np.unique(ids, return_inverse=True)
+        return EncodedLists(self.names[used], ids.astype(np.int32), offsets)
+
+    def _gather(self, rows):
+        """The ids of `rows` back to back, with their new offsets."""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        return self.ids[np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])], offsets
+
+    def rows_by_name(self, key=None):
+        """Inverted index: name (or key(name)) -> sorted int32 rows. Empty names are left out."""
+        if not len(self.ids):
+            return {}
+        rows = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+        order = np.argsort(self.ids, kind='stable')
+        ids, rows = self.ids[order], rows[order]
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        rows_by_name = {}
+        for code, postings in zip(ids[np.concatenate([[0], bounds])], np.split(rows, bounds)):
+            name = self.names[code] if key is None else key(self.names[code])
+            if name:
+                rows_by_name[name] = np.union1d(rows_by_name[name], postings) if name in rows_by_name else postings
+        return rows_by_name
+
+    def save(self, path, name):
+        with open(os.path.join(path, f'{name}_names.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.names.tolist(), f)
+        np.save(os.path.join(path, f'{name}_ids.npy'), self.ids)
+        np.save(os.path.join(path, f'{name}_offsets.npy'), self.offsets)
+
+    @classmethod
+    def load(cls, path, name):
+        with open(os.path.join(path, f'{name}_names.json'), encoding='utf-8') as f:
+            names = json.load(f)
+        names_array = np.empty(len(names), dtype=object)
+        names_array[:] = names
+        return cls(names_array,
+                   np.load(os.path.join(path, f'{name}_ids.npy'), mmap_mode='r'),
+                   np.load(os.path.join(path, f'{name}_offsets.npy'), mmap_mode='r'))
+
+def _build_lookups():
+    """Creates the title mappings and match columns from the current 'movies' table."""
+    with metrics.phase('lookups'):
+        _build_match_columns()
+        _build_title_rows()
+        _build_search_index()
+    _invalidate_recommend_cache()
+    _model_ready.set()
+
+def _build_title_rows(titles=None):
+    """
+    Dict lookups from title to row (title_to_index is _title_rows) and to tmdb_id, from the
+    titles of 'movies' (or `titles`) in row order, removed rows left out. Plain dicts: O(1)
+    lookups even when titles repeat, and incremental updates change them in place (see
+    _set_title_rows).
+    """
+    global title_to_index, title_to_tmdb_id, _title_rows, _duplicate_title_rows
+
+    _title_rows, _duplicate_title_rows, title_to_tmdb_id = {}, {}, {}
+    title_to_index = _title_rows
+    for row, title in enumerate(movies['title'].tolist() if titles is None else titles):
+        if not _active[row]:
+            continue
+        if title in _title_rows:
+            _duplicate_title_rows.setdefault(title, [_title_rows[title]]).append(row)
+        else:
+            _title_rows[title] = row
+            title_to_tmdb_id[title] = int(_tmdb_ids[row])
+
+def _set_title_rows(title, rows):
+    """Points `title` at `rows` (ascending) in the title lookups, or drops it if there are none."""
+    _duplicate_title_rows.pop(title, None)
+    if not rows:
+        _title_rows.pop(title, None)
+        title_to_tmdb_id.pop(title, None)
         return
+    _title_rows[title] = rows[0]
+    title_to_tmdb_id[title] = int(_tmdb_ids[rows[0]])
+    if len(rows) > 1:
+        _duplicate_title_rows[title] = list(rows)
 
-    # Merge DataFrames on 'id'
-    movies = metadata.merge(credits, on='id').merge(keywords, on='id')
+def _title_row(title, tmdb_id=None):
+    """
+    Row of the movie called `title`, None if there is none. A title shared by several movies
+    resolves to the one with `tmdb_id` when it is given, otherwise to the first loaded one.
+    """
+    row = _title_rows.get(title) if _title_rows is not None else None
+    if row is None or tmdb_id is None:
+        return row
+    for candidate in _duplicate_title_rows.get(title, (row,)):
+        if _tmdb_ids[candidate] == tmdb_id:
+            return candidate
+    return None
 
-    # Convert 'id' to numeric, coerce errors to NaN and drop them
-    movies['id'] = pd.to_numeric(movies['id'], errors='coerce')
-    movies.dropna(subset=['id'], inplace=True)
-    movies['id'] = movies['id'].astype(int)
+def _build_search_index():
+    """Indexes the titles offered by get_all_movies() for search_titles()."""
+    global title_search_index
 
-    # Process 'genres' and 'keywords' for soup (as space-separated strings)
-    movies['genres'] = movies['genres'].apply(extract_names, as_list=False)
-    movies['keywords'] = movies['keywords'].apply(extract_names, as_list=False)
+    title_search_index = TitleIndex(_title_rows)
 
-    # Process 'cast' for top actors
-    movies['top_actors_list'] = movies['cast'].apply(lambda x: extract_names(x, topn=3, as_list=True))
-    movies['top_actors_soup'] = movies['top_actors_list'].apply(lambda x: ' '.join(x))
+def _rows_by_key(keys_per_movie):
+    """Inverted index: key -> int32 array of the rows whose key list contains it."""
+    rows_by_key = {}
+    for row, keys in enumerate(keys_per_movie):
+        for key in keys:
+            rows_by_key.setdefault(key, []).append(row)
+    return {key: np.array(rows, dtype=np.int32) for key, rows in rows_by_key.items()}
 
-    # Process 'crew' for director
-    movies['director'] = movies['crew'].apply(get_director)
+def _build_match_columns():
+    """
+    Precomputes what get_recommendations and the selectbox helpers need from 'movies' and the
+    encoded facets: titles/ids as arrays, the actor/director/genre facet vocabularies, and
+    inverted indexes from each facet value to the rows that have it.
+    """
+    global _titles, _tmdb_ids, _actor_rows, _director_rows, _genre_token_rows
+    global _actor_vocab, _director_vocab, _genre_vocab, _genre_masks, _active, _row_buffers
 
-    # Create the 'soup' column for TF-IDF vectorization
-    def create_soup(row):
-        return f"{row['genres']} {row['keywords']} {row['top_actors_soup']} {row['director']}"
+    _row_buffers = {}
+    _titles = movies['title'].to_numpy(dtype=object)
+    _tmdb_ids = movies['tmdb_id'].to_numpy() if 'tmdb_id' in movies else np.zeros(len(movies), dtype=np.int64)
+
+    # Actors match by exact name, directors case-insensitively, genres per word (lowercased)
+    _actor_rows = movie_actors.rows_by_name()
+    _director_rows = movie_directors.rows_by_name(str.lower)
+    _genre_token_rows = movie_genres.rows_by_name(str.lower)
+
+    _actor_vocab = sorted({name.strip() for name in movie_actors.used_names() if name})
+    _director_vocab = sorted(movie_directors.used_names())
+    _genre_vocab = sorted({g.strip() for g in movie_genres.used_names() if g})
+
+    _active = np.ones(len(movies), dtype=bool)
+    _genre_masks = {}
+    _build_mood_masks()
 
-    movies['soup'] = movies.apply(create_soup, axis=1)
+def _build_mood_masks():
+    global _mood_masks
 
-    # TF-IDF Vectorization and Cosine Similarity
-    tfidf = TfidfVectorizer(stop_words='english')
-    soup_matrix = tfidf.fit_transform(movies['soup'].fillna(''))
-    cos_sim = cosine_similarity(soup_matrix, soup_matrix)
+    _mood_masks = {
+        mood: np.logical_or.reduce([_genre_mask(g) for g in related_genres])
+        for mood, related_genres in MOOD_GENRE_MAP.items()
+    }
+
+def _actor_mask(actor, rows):
+    """Which of `rows` list `actor` among their top actors."""
+    return np.isin(rows, _actor_rows.get(actor, _NO_ROWS))
+
+def _director_mask(director, rows):
+    """Which of `rows` were directed by `director` (case-insensitive)."""
+    return np.isin(rows, _director_rows.get(director.lower(), _NO_ROWS))
+
+def _genre_mask(genre):
+    """
+    Boolean column: movies whose genres contain `genre` (case-insensitive substring, as before).
+    Built from the genre index (every genre word containing it). Cached for the genre words of
+    the catalog only, so that arbitrary filter strings (e.g. from the HTTP service) don't pile up.
+    """
+    key = genre.lower()
+    mask = _genre_masks.get(key)
+    if mask is None:
+        mask = np.zeros(len(movies), dtype=bool)
+        if ' ' in key:
+            # Spans words: only movies with a word ending in the first part and one starting with
+            # the last part can match, the full strings of those tell
+            first, last = key.split(' ')[0], key.split(' ')[-1]
+            candidates = np.intersect1d(
+                np.concatenate([_NO_ROWS] + [rows for token, rows in _genre_token_rows.items() if token.endswith(first)]),
+                np.concatenate([_NO_ROWS] + [rows for token, rows in _genre_token_rows.items() if token.startswith(last)]),
+            )
+            mask[[row for row in candidates.tolist() if key in ' '.join(movie_genres.get(row)).lower()]] = True
+        else:
+            for token, rows in _genre_token_rows.items():
+                if key in token:
+                    mask[rows] = True
+        if key in _genre_token_rows:
+            _genre_masks[key] = mask
+    return mask
+
+def prepare_movies(merged, n_jobs=1):
+    """
+    Turns merged metadata/credits/keywords rows (raw JSON-literal columns) into the runtime
+    columns: tmdb_id, title, soup, genres, director, top_actors_list. _fit_model/add_movies
+    vectorize the soup and keep only the encoded facets (see _encode_movies).
+    """
+    movies = _numeric_ids(merged.copy())
+
+    # Parse genres/keywords (as space-separated strings), the top actors and the director;
+    # in row chunks over a process pool when there is enough to parse
+    if n_jobs > 1 and len(movies) > PARSE_CHUNK_ROWS:
+        bounds = [(start, min(start + PARSE_CHUNK_ROWS, len(movies))) for start in range(0, len(movies), PARSE_CHUNK_ROWS)]
+        with _process_pool(min(n_jobs, len(bounds)), _init_worker, (movies,)) as pool:
+            movies = pd.concat(list(pool.map(_parse_chunk, bounds)))
+    else:
+        movies = _parse_columns(movies)
+    return _assemble_movies(movies)
+
+def _numeric_ids(frame):
+    """Rows of `frame` with a numeric 'id', as int."""
+    # Convert 'id' to numeric, coerce errors to NaN and drop them
+    frame['id'] = pd.to_numeric(frame['id'], errors='coerce')
+    frame = frame.dropna(subset=['id'])
+    frame['id'] = frame['id'].astype(int)
+    return frame
+
+def _assemble_movies(movies):
+    """Builds the soup from parsed rows and selects the prepared columns."""
+    # Create the 'soup' column for TF-IDF vectorization
+    actors = movies['top_actors_list'].str.join(' ') if len(movies) else ''
+    movies['soup'] = movies['genres'] + ' ' + movies['keywords'] + ' ' + actors + ' ' + movies['director']
 
     # Prepare final 'movies' DataFrame for recommendations and lookups
     movies = movies[['id', 'title', 'soup', 'genres', 'director', 'top_actors_list']].rename(columns={'id': 'tmdb_id'})
     movies.reset_index(drop=True, inplace=True)
+    return movies
+
+def _facet_lists(prepared):
+    """The facet columns of prepared movies as name lists: (actors, genre words, directors)."""
+    return (
+        prepared['top_actors_list'].tolist(),
+        [genres.split(' ') if genres else [] for genres in prepared['genres'].fillna('').astype(str)],
+        [[director] for director in prepared['director'].fillna('').astype(str)],
+    )
+
+def _encode_movies(prepared):
+    return tuple(EncodedLists.from_lists(lists) for lists in _facet_lists(prepared))
+
+def _fit_model(prepared):
+    """Fits TF-IDF on the prepared movies, computes the neighbor index and sets the model globals."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    # TF-IDF Vectorization; the soup itself is not kept
+    with metrics.phase('tfidf'):
+        tfidf = TfidfVectorizer(stop_words='english')
+        matrix = tfidf.fit_transform(prepared['soup'].fillna(''))
+        vocabulary = {term: int(col) for term, col in tfidf.vocabulary_.items()}
+    _install(prepared[['tmdb_id', 'title']].reset_index(drop=True), _encode_movies(prepared), matrix, vocabulary, tfidf.idf_)
+
+def _install(table, encoded, matrix, vocabulary, idf):
+    """Sets the model globals from a fitted TF-IDF matrix and computes the top-k cosine neighbors."""
+    global movies, movie_actors, movie_genres, movie_directors, soup_matrix, tfidf_vocabulary, tfidf_idf
+    global neighbor_indices, neighbor_scores, neighbor_stats, _pending_updates
+
+    if NEIGHBOR_BACKEND not in NEIGHBOR_BACKENDS:
+        raise ValueError(f"Unknown NEIGHBOR_BACKEND '{NEIGHBOR_BACKEND}', expected one of {sorted(NEIGHBOR_BACKENDS)}")
+    with metrics.phase('neighbors'):
+        neighbor_indices, neighbor_scores, neighbor_stats = NEIGHBOR_BACKENDS[NEIGHBOR_BACKEND](matrix)
+
+    movies = table
+    movie_actors, movie_genres, movie_directors = encoded
+    soup_matrix = matrix
+    tfidf_vocabulary = vocabulary
+    tfidf_idf = idf
+    _pending_updates = 0
 
     # Create mappings for quick lookups
-    title_to_index = pd.Series(movies.index, index=movies['title'])
-    title_to_tmdb_id = pd.Series(movies['tmdb_id'].values, index=movies['title'])
+    _build_lookups()
+
+def read_catalog(metadata_path=DATA_FILES[0], credits_path=DATA_FILES[1], keywords_path=DATA_FILES[2]):
+    """Reads the three CSVs and merges them on 'id' (raw JSON-literal columns, see prepare_movies)."""
+    metadata = pd.read_csv(metadata_path)
+    credits = pd.read_csv(credits_path)
+    keywords = pd.read_csv(keywords_path)
+
+    # Merge DataFrames on 'id'
+    return metadata.merge(credits, on='id').merge(keywords, on='id')
+
+def _stream_reduced(path, columns, ids, chunk_rows):
+    """
+    Reads `columns` of a CSV `chunk_rows` rows at a time. Each chunk is cut down to the rows
+    whose id is in `ids` and parsed right away, so only the reduced rows are kept.
+    """
+    parts = []
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+        chunk = _numeric_ids(chunk)
+        chunk = chunk[chunk['id'].isin(ids)]
+        if len(chunk):
+            parts.append(_parse_columns(chunk))
+    if not parts:
+        return _parse_columns(pd.DataFrame({column: pd.Series(dtype=object) for column in columns}).astype({'id': int}))
+    return pd.concat(parts, ignore_index=True)
 
+def stream_catalog(metadata_path=DATA_FILES[0], credits_path=DATA_FILES[1], keywords_path=DATA_FILES[2],
+                   chunk_rows=None):
+    """
+    prepare_movies(read_catalog(...)) with bounded memory: the credits and keywords CSVs (the
+    cast/crew JSON blobs are by far the largest input) are streamed `chunk_rows` rows at a
+    time (default STREAM_CSV_CHUNK_ROWS) and each chunk is reduced to the top actors, the
+    director and the keyword names before the next one is read. Peak memory is one chunk plus
+    the reduced catalog, however large the files are. Only the columns the model uses are read.
+    """
+    chunk_rows = chunk_rows or STREAM_CSV_CHUNK_ROWS or 5000
+    metadata = _parse_columns(_numeric_ids(pd.read_csv(metadata_path, usecols=['id', 'title', 'genres'])))
+    ids = metadata['id'].unique()
+    credits = _stream_reduced(credits_path, ['id', 'cast', 'crew'], ids, chunk_rows)
+    keywords = _stream_reduced(keywords_path, ['id', 'keywords'], ids, chunk_rows)
+    return _assemble_movies(metadata.merge(credits, on='id').merge(keywords, on='id'))
+
+def build_model(metadata_path=DATA_FILES[0], credits_path=DATA_FILES[1], keywords_path=DATA_FILES[2]):
+    """
+    Builds the model from the CSVs: parses and merges them, fits TF-IDF and computes the
+    neighbor index. Sets the model globals; raises FileNotFoundError if a CSV is missing.
+    With STREAM_CSV_CHUNK_ROWS set the CSVs are streamed (see stream_catalog).
+    """
+    if STREAM_CSV_CHUNK_ROWS > 0:
+        with metrics.phase('read_parse'):
+            prepared = stream_catalog(metadata_path, credits_path, keywords_path)
+    else:
+        with metrics.phase('read_csv'):
+            merged = read_catalog(metadata_path, credits_path, keywords_path)
+        with metrics.phase('parse'):
+            prepared = prepare_movies(merged, n_jobs=BUILD_JOBS)
+    _fit_model(prepared)
+
+@metrics.timed('load_data_seconds')
+def load_data(rebuild=False, artifact_dir=ARTIFACT_DIR):
+    """
+    Loads the recommender model. Uses the persisted artifact when it matches the hash of the
+    input CSVs, otherwise rebuilds the model from the CSVs and saves a new artifact.
+    Initializes global 'movies' DataFrame, nearest-neighbor index, and mappings.
+    With metrics enabled, each phase's time is in the load_phase_seconds gauge.
+    Called by ensure_loaded on first use; calling it again reloads the model.
+    """
+    with _load_lock:
+        _load_data(rebuild, artifact_dir)
+
+def _load_data(rebuild, artifact_dir):
+    global movies, movie_actors, movie_genres, movie_directors, soup_matrix, tfidf_vocabulary, tfidf_idf
+    global neighbor_indices, neighbor_scores, neighbor_stats
+
+    try:
+        with metrics.phase('hash'):
+            data_hash = compute_data_hash()
+        if not rebuild and load_artifact(data_hash, artifact_dir):
+            return
+        build_model()
+    except FileNotFoundError as e:
+        # A deployed artifact is enough to serve recommendations without the CSVs
+        if not rebuild and load_artifact(None, artifact_dir):
+            return
+        print(f"Error loading data files: {e}. Make sure 'data/' directory contains the CSVs.")
+        # Create empty DataFrames to avoid further errors and allow app to start
+        # Use dummy values that won't cause immediate issues.
+        movies = pd.DataFrame({'id': [0], 'title': ["Error Loading Data"]})
+        movie_actors = EncodedLists.from_lists([[]])
+        movie_genres = EncodedLists.from_lists([["dummy"]])
+        movie_directors = EncodedLists.from_lists([["dummy"]])
+        soup_matrix = sp.csr_matrix((1, 1))
+        tfidf_vocabulary = {}
+        tfidf_idf = np.zeros(1)
+        neighbor_indices = np.zeros((1, 1), dtype=np.int32) # Initialize with a dummy neighbor
+        neighbor_scores = np.zeros((1, 1), dtype=np.float32)
+        neighbor_stats = None
+        _build_match_columns()
+        _build_title_rows(["Dummy Movie"])
+        _build_search_index()
+        _invalidate_recommend_cache()
+        _model_ready.set()
+        return
+
+    with metrics.phase('save_artifact'):
+        save_artifact(data_hash, artifact_dir)
+
+# --- Lazy loading ---
+# Nothing is loaded at import: the first call that needs the model loads it (ensure_loaded),
+# or load_in_background() starts loading it from a thread so the caller can get on with
+# other work, e.g. the app rendering its search box while the model warms up.
+_load_lock = threading.RLock()  # held while (re)loading; waiting callers block on it
+_model_ready = threading.Event() # set once a model is installed (see _build_lookups)
+_load_thread = None
+_load_thread_lock = threading.Lock()
+
+def is_loaded():
+    """True once a model is loaded (it may still be the error placeholder, see load_data)."""
+    return _model_ready.is_set()
+
+def ensure_loaded():
+    """Loads the model if it isn't loaded yet. If another thread is loading it, waits for that load."""
+    if _model_ready.is_set():
+        return
+    with _load_lock:
+        if not _model_ready.is_set():
+            load_data()
+
+def _background_load():
+    try:
+        ensure_loaded()
+    except Exception as e:
+        # The next call that needs the model tries again (and raises the error to its caller)
+        print(f"Error loading the model in the background: {e}")
+
+def load_in_background():
+    """
+    Starts loading the model in a daemon thread, unless it is loaded or already loading.
+    Returns the readiness event: ready.is_set() says whether the model is loaded and
+    ready.wait(timeout) waits for it. Calls that need the model meanwhile wait for the load.
+    """
+    global _load_thread
+    with _load_thread_lock:
+        if not _model_ready.is_set() and (_load_thread is None or not _load_thread.is_alive()):
+            _load_thread = threading.Thread(target=_background_load, name="model-load", daemon=True)
+            _load_thread.start()
+    return _model_ready
+
+def _requires_model(fn):
+    """Decorator for the functions that need the model: loads it on the first call."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _model_ready.is_set():
+            ensure_loaded()
+        return fn(*args, **kwargs)
+    return wrapper
+
+def _project_soups(soups):
+    """
+    TF-IDF rows for new soups, weighted with the fitted idf and l2-normalized like
+    TfidfVectorizer does. Terms the vocabulary doesn't know get new columns (idf from the
+    current catalog size), so that refit_model can work from the matrix alone once the
+    soups are gone. Widens soup_matrix/tfidf_idf to match.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    from sklearn.preprocessing import normalize
+    global soup_matrix, tfidf_idf
+
+    soups = soups.fillna('')
+    analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+    new_terms = {} # term -> number of new soups containing it
+    for soup in soups:
+        for term in set(analyzer(soup)):
+            if term not in tfidf_vocabulary:
+                new_terms[term] = new_terms.get(term, 0) + 1
+    if new_terms:
+        n = int(_active.sum()) + len(soups)
+        for term in new_terms:
+            tfidf_vocabulary[term] = len(tfidf_vocabulary)
+        df = np.array(list(new_terms.values()))
+        tfidf_idf = np.concatenate([tfidf_idf, np.log((1 + n) / (1 + df)) + 1])
+        soup_matrix = sp.csr_matrix((soup_matrix.data, soup_matrix.indices, soup_matrix.indptr),
+                                    shape=(soup_matrix.shape[0], len(tfidf_vocabulary)))
+    counts = CountVectorizer(stop_words='english', vocabulary=tfidf_vocabulary).transform(soups)
+    return normalize(sp.csr_matrix(counts.multiply(np.asarray(tfidf_idf))))
+
+def _active_similarity(row_matrix):
+    """
+    Cosine similarity of some TF-IDF rows against every movie, removed movies pushed to -1.
+    For a few rows (a single add) it's the plain product, the rows being l2-normalized already:
+    cosine_similarity normalizes soup_matrix and converts it to CSC, two copies of the whole
+    matrix that only pay off over larger blocks.
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+    if row_matrix.shape[0] <= 32:
+        block = (soup_matrix @ row_matrix.T).T.toarray()
+    else:
+        block = cosine_similarity(row_matrix, soup_matrix)
+    block[:, ~_active] = -1.0
+    return block
+
+def _recompute_neighbors(rows):
+    """Rebuilds the neighbor lists of `rows` against the active catalog."""
+    n, k = soup_matrix.shape[0], neighbor_indices.shape[1]
+    chunk_rows = max(1, NEIGHBOR_BLOCK_BYTES // max(1, n * 8))
+    for start in range(0, len(rows), chunk_rows):
+        block_rows = rows[start:start + chunk_rows]
+        neighbor_indices[block_rows], neighbor_scores[block_rows] = _top_k(_active_similarity(soup_matrix[block_rows]), k)
+
+def _merge_neighbors(similarity, columns):
+    """
+    Offers new movies (`columns`) to the existing neighbor lists. `similarity` is
+    (existing rows x new movies). Only rows where a new movie scores at least as high as the
+    current last neighbor are touched. Returns the number of rows updated.
+    """
+    k = neighbor_indices.shape[1]
+    similarity = similarity.astype(np.float32)
+    n = len(similarity)
+    hit_rows, hit_cols = np.nonzero((similarity >= neighbor_scores[:n, -1:]) & _active[:n, None])
+    if not len(hit_rows):
+        return 0
+
+    # Each affected row: its current list plus the new movies that made the cut
+    rows, positions = np.unique(hit_rows, return_inverse=True)
+    row_ids = np.concatenate([np.repeat(np.arange(len(rows)), k), positions])
+    indices = np.concatenate([neighbor_indices[rows].ravel(), np.asarray(columns)[hit_cols]])
+    scores = np.concatenate([neighbor_scores[rows].ravel(), similarity[hit_rows, hit_cols]])
+    # Same order as _top_k: score descending, ties broken by lower movie index
+    order = np.lexsort((indices, -scores, row_ids))
+    row_starts = np.searchsorted(row_ids[order], np.arange(len(rows)))
+    take = order[(row_starts[:, None] + np.arange(k)).ravel()]
+    neighbor_indices[rows] = indices[take].reshape(-1, k)
+    neighbor_scores[rows] = scores[take].reshape(-1, k)
+    return len(rows)
+
+def _writable_neighbors():
+    """Copies the neighbor arrays out of the memory-mapped artifact before changing them."""
+    global neighbor_indices, neighbor_scores
+
+    if not neighbor_indices.flags.writeable:
+        neighbor_indices = np.array(neighbor_indices)
+    if not neighbor_scores.flags.writeable:
+        neighbor_scores = np.array(neighbor_scores)
+
+def _insert_sorted(vocab, names):
+    for name in names:
+        pos = bisect.bisect_left(vocab, name)
+        if pos == len(vocab) or vocab[pos] != name:
+            vocab.insert(pos, name)
+
+def _drop_postings(rows_by_key, vocab, keys_and_names, rows):
+    """Removes `rows` from the postings of the given keys; a name whose key has no rows left leaves the vocabulary."""
+    for key, name in keys_and_names:
+        postings = rows_by_key.get(key)
+        if postings is None:
+            continue
+        postings = postings[~np.isin(postings, rows)]
+        if len(postings):
+            rows_by_key[key] = postings
+        else:
+            del rows_by_key[key]
+            pos = bisect.bisect_left(vocab, name)
+            if pos < len(vocab) and vocab[pos] == name:
+                del vocab[pos]
+
+def _append_rows(prepared):
+    """Appends prepared movies to the model: matrix, neighbors, lookups and match columns."""
+    global movies, soup_matrix, neighbor_indices, neighbor_scores, _titles, _tmdb_ids, _active
+
+    start = len(movies)
+    new_rows = np.arange(start, start + len(prepared), dtype=np.int32)
+    new_matrix = _project_soups(prepared['soup'])
+    genres_lower = prepared['genres'].fillna('').astype(str).str.lower().to_numpy(dtype=object)
+
+    movies = pd.concat([movies, prepared[['tmdb_id', 'title']]], ignore_index=True)
+    for lists, new_lists in zip((movie_actors, movie_genres, movie_directors), _facet_lists(prepared)):
+        lists.extend(new_lists)
+    # The per-row arrays grow in place (see _extended), only the new rows get written
+    soup_matrix = sp.csr_matrix((
+        _extended(_row_buffers, 'soup_data', soup_matrix.data, new_matrix.data),
+        _extended(_row_buffers, 'soup_indices', soup_matrix.indices, new_matrix.indices),
+        _extended(_row_buffers, 'soup_indptr', soup_matrix.indptr, new_matrix.indptr[1:] + soup_matrix.indptr[-1]),
+    ), shape=(start + len(prepared), soup_matrix.shape[1]), copy=False)
+    _active = _extended(_row_buffers, 'active', _active, np.ones(len(prepared), dtype=bool))
+    _titles = _extended(_row_buffers, 'titles', _titles, prepared['title'].to_numpy(dtype=object))
+    _tmdb_ids = _extended(_row_buffers, 'tmdb_ids', _tmdb_ids, prepared['tmdb_id'].to_numpy())
+
+    # Neighbors of the new movies, and the new movies offered to everyone else's lists
+    n, k = soup_matrix.shape[0], neighbor_indices.shape[1]
+    neighbor_indices = _extended(_row_buffers, 'neighbor_indices', neighbor_indices, np.zeros((len(prepared), k), dtype=np.int32))
+    neighbor_scores = _extended(_row_buffers, 'neighbor_scores', neighbor_scores, np.zeros((len(prepared), k), dtype=np.float32))
+    chunk_rows = max(1, NEIGHBOR_BLOCK_BYTES // max(1, n * 8))
+    for chunk in range(0, len(prepared), chunk_rows):
+        rows = new_rows[chunk:chunk + chunk_rows]
+        block = _active_similarity(new_matrix[chunk:chunk + chunk_rows])
+        neighbor_indices[rows], neighbor_scores[rows] = _top_k(block, k)
+        _merge_neighbors(block[:, :start].T, rows)
+
+    title_search_index.add(prepared['title'].unique())
+    for title, row in zip(prepared['title'], new_rows.tolist()):
+        _set_title_rows(title, _duplicate_title_rows.get(title, [_title_rows[title]] if title in _title_rows else []) + [row])
+
+    actor_lists = prepared['top_actors_list'].tolist()
+    directors = prepared['director'].fillna('').astype(str).tolist()
+    for facet, rows_by_key, keys_per_movie in (
+        ('actor', _actor_rows, actor_lists),
+        ('director', _director_rows, [[d.lower()] if d else [] for d in directors]),
+        ('genre', _genre_token_rows, [[g for g in genres.split(' ') if g] for genres in genres_lower]),
+    ):
+        for key, rows in _rows_by_key(keys_per_movie).items():
+            rows_by_key[key] = _extended(_row_buffers, (facet, key), rows_by_key.get(key, _NO_ROWS), rows + start)
+    _insert_sorted(_actor_vocab, {name.strip() for actors in actor_lists for name in actors if name})
+    _insert_sorted(_director_vocab, set(prepared['director'].dropna().astype(str)))
+    _insert_sorted(_genre_vocab, {g.strip() for genres in prepared['genres'].dropna() for g in genres.split(' ') if g})
+
+    # Genre and mood masks are substring matches on the genre string, extend them the same way
+    for key, mask in list(_genre_masks.items()):
+        _genre_masks[key] = _extended(_row_buffers, ('genre_mask', key), mask,
+                                      np.array([key in genres for genres in genres_lower], dtype=bool))
+    for mood, related_genres in MOOD_GENRE_MAP.items():
+        related = [g.lower() for g in related_genres]
+        _mood_masks[mood] = _extended(_row_buffers, ('mood_mask', mood), _mood_masks[mood],
+                                      np.array([any(g in genres for g in related) for genres in genres_lower], dtype=bool))
+    _invalidate_recommend_cache()
+
+def _remove_rows(rows):
+    """Tombstones movie rows: they leave the lookups and facets, and every neighbor list."""
+    _writable_neighbors()
+    _active[rows] = False
+
+    removed = set(np.asarray(rows).tolist())
+    for title in set(_titles[rows]):
+        title_rows = _duplicate_title_rows.get(title, [_title_rows[title]] if title in _title_rows else [])
+        _set_title_rows(title, [row for row in title_rows if row not in removed])
+    title_search_index.discard([title for title in set(_titles[rows]) if title not in title_to_index])
+
+    _drop_postings(_actor_rows, _actor_vocab,
+                   [(name, name.strip()) for row in rows for name in movie_actors.get(row)], rows)
+    _drop_postings(_director_rows, _director_vocab,
+                   [(d.lower(), d) for row in rows for d in movie_directors.get(row) if d], rows)
+    _drop_postings(_genre_token_rows, _genre_vocab,
+                   [(g.lower(), g) for row in rows for g in movie_genres.get(row) if g], rows)
+    for mask in list(_genre_masks.values()) + list(_mood_masks.values()):
+        mask[rows] = False
+
+    # Only lists that pointed at a removed movie need a new neighbor
+    affected = np.flatnonzero(_active & np.isin(neighbor_indices, rows).any(axis=1))
+    _recompute_neighbors(affected)
+    _invalidate_recommend_cache()
+
+def _maybe_refit():
+    if _pending_updates > REFIT_FRACTION * max(1, int(_active.sum())):
+        refit_model()
+
+@_requires_model
+def add_movies(new_movies):
+    """
+    Adds movies to the loaded model without a full rebuild. `new_movies` has the merged CSV
+    columns (id, title, genres, cast, crew, keywords). Only the new rows are parsed; they are
+    projected into the fitted TF-IDF space, get their own neighbor lists, and are offered to the
+    existing lists they would enter. A movie whose tmdb_id is already loaded replaces it.
+    The change is in memory only; the saved artifact is not touched.
+    Returns the number of movies added.
+    """
+    global _pending_updates
+
+    prepared = prepare_movies(new_movies).drop_duplicates('tmdb_id', keep='last').reset_index(drop=True)
+    if prepared.empty:
+        return 0
+    if movies is None or 'tmdb_id' not in movies:
+        # Nothing (or only the error placeholder) loaded, start a model from these movies
+        _fit_model(prepared)
+        return len(prepared)
+
+    replaced = np.flatnonzero(_active & np.isin(_tmdb_ids, prepared['tmdb_id'].to_numpy()))
+    if len(replaced):
+        _remove_rows(replaced)
+    _append_rows(prepared)
+    _pending_updates += len(replaced) + len(prepared)
+    _maybe_refit()
+    return len(prepared)
+
+@_requires_model
+def remove_movies(titles=None, tmdb_ids=None):
+    """
+    Removes movies by title (every movie with that title) and/or tmdb_id without a full rebuild.
+    Neighbor lists are recomputed only for the movies that had a removed one among their neighbors.
+    The change is in memory only. Returns the number of movies removed.
+    """
+    global _pending_updates
+
+    if movies is None or 'tmdb_id' not in movies:
+        return 0
+    rows = np.zeros(len(movies), dtype=bool)
+    if titles is not None:
+        rows |= np.isin(_titles, list(titles))
+    if tmdb_ids is not None:
+        rows |= np.isin(_tmdb_ids, list(tmdb_ids))
+    rows = np.flatnonzero(rows & _active)
+    if not len(rows):
+        return 0
+
+    _remove_rows(rows)
+    _pending_updates += len(rows)
+    _maybe_refit()
+    return len(rows)
+
+@_requires_model
+def refit_model():
+    """
+    Refits TF-IDF and rebuilds the neighbor index on the current catalog, dropping removed
+    rows. add_movies/remove_movies call it once enough of the catalog has changed.
+    Works from soup_matrix alone: the df of each term is its nonzero count, and since each
+    value is count * idf / norm, re-weighting with new_idf / old_idf and normalizing again
+    gives what a fresh TfidfVectorizer fit on the soups would.
+    """
+    from sklearn.preprocessing import normalize
+    if movies is None or 'tmdb_id' not in movies:
+        return
+    rows = np.flatnonzero(_active)
+    matrix = soup_matrix[rows]
+    df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    # TfidfVectorizer numbers the terms alphabetically and drops the ones no movie uses
+    terms = sorted(term for term, col in tfidf_vocabulary.items() if df[col])
+    columns = np.array([tfidf_vocabulary[term] for term in terms], dtype=np.int64)
+    idf = np.log((1 + len(rows)) / (1 + df[columns])) + 1
+    matrix = normalize(sp.csr_matrix(matrix[:, columns].multiply(idf / np.asarray(tfidf_idf)[columns])))
+    _install(movies.iloc[rows].reset_index(drop=True),
+             tuple(lists.take(rows) for lists in (movie_actors, movie_genres, movie_directors)),
+             matrix, {term: col for col, term in enumerate(terms)}, idf)
+
+def _rank_block(rows, actors, directors, genres, moods, topn):
+    """
+    Re-ranks the neighbors of several movies at once.
+    `rows` are movie row indices; the filter lists hold one value (or None) per row.
+    Returns one list of recommendation dicts per row.
+    """
+    # Neighbors are already sorted by similarity; skip the first one (the input movie itself)
+    candidates = neighbor_indices[rows, 1:]
+    similarity = neighbor_scores[rows, 1:].astype(np.float64)
+    n_candidates = candidates.shape[1]
+
+    def filter_mask(values, mask_for):
+        # One (rows, candidates) mask, computed once per distinct filter value in the block
+        mask = np.zeros(candidates.shape, dtype=bool)
+        rows_by_value = {}
+        for i, value in enumerate(values):
+            if value:
+                rows_by_value.setdefault(value, []).append(i)
+        for value, block_rows in rows_by_value.items():
+            mask[block_rows] = mask_for(value, candidates[block_rows])
+        return mask
+
+    moods = [m if m and m.lower() in _mood_masks else None for m in moods]
+    matches = [
+        (0.5, actors, filter_mask(actors, _actor_mask), "Features {}"),
+        (0.5, directors, filter_mask(directors, _director_mask), "Directed by {}"),
+        (0.3, genres, filter_mask(genres, lambda g, c: _genre_mask(g)[c]), "Is a {} movie"),
+        (0.3, moods, filter_mask(moods, lambda m, c: _mood_masks[m.lower()][c]), "Matches your '{}' mood"),
+    ]
+
+    boost = np.zeros(candidates.shape)
+    for weight, _, mask, _ in matches:
+        boost += np.where(mask, weight, 0.0)
+    final_score = boost + similarity
+
+    # Same ordering as pandas' sort_values(ascending=False), which argsorts the reversed array,
+    # so ties come out exactly as they always have
+    order = (n_candidates - 1 - final_score[:, ::-1].argsort(axis=1))[:, ::-1][:, :topn]
+    picked = np.take_along_axis(candidates, order, axis=1)
+    titles = _titles[picked].tolist()
+    tmdb_ids = _tmdb_ids[picked].tolist()
+
+    results = []
+    for i, columns in enumerate(order.tolist()):
+        active = [(mask[i], template.format(values[i])) for _, values, mask, template in matches if values[i]]
+        recommendations = []
+        for j, column in enumerate(columns):
+            reason = "; ".join(text for mask_row, text in active if mask_row[column])
+            recommendations.append({
+                'title': titles[i][j],
+                'tmdb_id': tmdb_ids[i][j],
+                'reason': reason or "Similar to your favorite movie",
+            })
+        results.append(recommendations)
+    return results
+
+# --- Recommendation cache ---
+# get_recommendations results keyed on all of its arguments (empty filters count as None, they
+# mean the same), plus the unfiltered lists warm_recommend_cache precomputes. Both are emptied
+# whenever the model changes: (re)load, refit, add_movies/remove_movies.
+_recommend_cache = OrderedDict() # key -> (expires_at or None, recommendations, bytes)
+_precomputed = {}                # title -> (expires_at or None, topn, recommendations, bytes)
+_title_requests = Counter()      # title -> get_recommendations calls, for warm_recommend_cache
+_cache_generation = 0            # bumped on every invalidation; results computed before it are not stored
+_cache_bytes = 0
+_cache_stats = {'hits': 0, 'precomputed_hits': 0, 'misses': 0, 'invalidations': 0}
+_cache_lock = threading.Lock()
+
+def _recommendations_size(recommendations):
+    """Approximate bytes held by a list of recommendation dicts (tmdb_ids are small ints)."""
+    return sys.getsizeof(recommendations) + sum(
+        sys.getsizeof(r) + sys.getsizeof(r['title']) + sys.getsizeof(r['reason']) for r in recommendations)
+
+def _invalidate_recommend_cache():
+    global _cache_generation, _cache_bytes
+    with _cache_lock:
+        _recommend_cache.clear()
+        _precomputed.clear()
+        _cache_bytes = 0
+        _cache_generation += 1
+        _cache_stats['invalidations'] += 1
+
+def _expired(expires_at):
+    return expires_at is not None and expires_at <= time.time()
+
+def _cache_get(key):
+    """Cached recommendations for key (title, actor, director, genre, mood, topn), or None."""
+    title, topn = key[0], key[5]
+    with _cache_lock:
+        entry = _recommend_cache.get(key)
+        if entry is not None and not _expired(entry[0]):
+            _recommend_cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            _title_requests[title] += 1
+            return entry[1]
+        if entry is not None:
+            _drop_cached(key)
+        precomputed = _precomputed.get(title)
+        if precomputed is not None and _expired(precomputed[0]):
+            _drop_precomputed(title)
+        elif precomputed is not None and key[1:5] == (None, None, None, None) and 0 < topn <= precomputed[1]:
+            _cache_stats['precomputed_hits'] += 1
+            _title_requests[title] += 1
+            return precomputed[2][:topn]
+        _cache_stats['misses'] += 1
+        return None
+
+# The callers of these two hold _cache_lock
+def _drop_cached(key):
+    global _cache_bytes
+    _cache_bytes -= _recommend_cache.pop(key)[2]
+
+def _drop_precomputed(title):
+    global _cache_bytes
+    _cache_bytes -= _precomputed.pop(title)[3]
+
+def _cache_put(key, recommendations, generation):
+    global _cache_bytes
+    with _cache_lock:
+        _title_requests[key[0]] += 1
+        if RECOMMEND_CACHE_SIZE <= 0 or generation != _cache_generation:
+            return
+        if key in _recommend_cache:
+            _drop_cached(key)
+        size = _recommendations_size(recommendations)
+        expires_at = time.time() + RECOMMEND_CACHE_TTL if RECOMMEND_CACHE_TTL > 0 else None
+        _recommend_cache[key] = (expires_at, recommendations, size)
+        _cache_bytes += size
+        while len(_recommend_cache) > RECOMMEND_CACHE_SIZE:
+            _drop_cached(next(iter(_recommend_cache)))
+
+@_requires_model
+def warm_recommend_cache(titles=None, n=100, topn=RECOMMEND_PRECOMPUTE_TOPN):
+    """
+    Precomputes the unfiltered top-`topn` recommendations of `titles` (default: the n titles
+    get_recommendations was asked for most) with one recommend_batch call. Unfiltered requests
+    for those titles with up to `topn` results are then served from these lists. At most
+    RECOMMEND_PRECOMPUTE_TITLES titles keep a list, the most requested ones. The lists expire
+    like the cached results and are dropped when the model changes, so call this again
+    (periodically, or after a reload).
+    Returns the number of titles precomputed.
+    """
+    global _cache_bytes
+    with _cache_lock:
+        if titles is None:
+            titles = [title for title, _ in _title_requests.most_common(n)]
+        titles = [title for title in dict.fromkeys(titles) if title in _title_rows]
+        titles = sorted(titles, key=lambda title: -_title_requests[title])[:max(0, RECOMMEND_PRECOMPUTE_TITLES)]
+    if not titles:
+        return 0
+    generation = _cache_generation
+    lists = recommend_batch(titles, topn=topn)
+    with _cache_lock:
+        if generation != _cache_generation:
+            return 0 # the model changed meanwhile
+        expires_at = time.time() + RECOMMEND_CACHE_TTL if RECOMMEND_CACHE_TTL > 0 else None
+        for title, recommendations in zip(titles, lists):
+            if title in _precomputed:
+                _drop_precomputed(title)
+            size = _recommendations_size(recommendations)
+            _precomputed[title] = (expires_at, topn, recommendations, size)
+            _cache_bytes += size
+        if len(_precomputed) > RECOMMEND_PRECOMPUTE_TITLES:
+            # Keep the most requested titles (the ones just warmed win ties)
+            warmed = set(titles)
+            ranked = sorted(_precomputed, key=lambda title: (_title_requests[title], title in warmed), reverse=True)
+            for title in ranked[RECOMMEND_PRECOMPUTE_TITLES:]:
+                _drop_precomputed(title)
+        return sum(title in _precomputed for title in titles)
+
+def get_recommend_cache_stats():
+    """Hit/miss counters, hit rate, entries and approximate memory (bytes) of the recommendation cache."""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats['entries'] = len(_recommend_cache)
+        stats['precomputed_titles'] = len(_precomputed)
+        stats['bytes'] = _cache_bytes
+    lookups = stats['hits'] + stats['precomputed_hits'] + stats['misses']
+    stats['hit_rate'] = (stats['hits'] + stats['precomputed_hits']) / lookups if lookups else 0.0
+    return stats
+
+def clear_recommend_cache():
+    """Empties the recommendation cache (precomputed lists included) and resets the counters."""
+    _invalidate_recommend_cache()
+    with _cache_lock:
+        for stat in _cache_stats:
+            _cache_stats[stat] = 0
+        _title_requests.clear()
+
+@metrics.register_collector
+def _recommend_cache_metrics():
+    """Recommendation cache counters for metrics.snapshot()/prometheus_text()."""
+    stats = get_recommend_cache_stats()
+    values = {f'recommend_cache_{stat}_total': stats[stat]
+              for stat in ('hits', 'precomputed_hits', 'misses', 'invalidations')}
+    values.update({f'recommend_cache_{stat}': stats[stat]
+                   for stat in ('entries', 'precomputed_titles', 'bytes', 'hit_rate')})
+    return values
+
+@_requires_model
+@metrics.timed('recommend_seconds')
 def get_recommendations(fav_movie, actor=None, director=None, genre=None, mood=None, topn=5):
     """
     Generates movie recommendations based on a favorite movie and optional preferences.
+    Boosts are computed for all candidates at once from the precomputed match columns.
+    Results are cached (see RECOMMEND_CACHE_SIZE and warm_recommend_cache); each call gets its
+    own copy of the dicts.
     """
     # Check if data is loaded and fav_movie exists in the index
-    if movies is None or fav_movie not in title_to_index or title_to_index.empty:
+    if movies is None or not title_to_index:
+        return []
+    key = (fav_movie, actor or None, director or None, genre or None, mood or None, topn)
+    cached = _cache_get(key)
+    if cached is not None:
+        return [dict(r) for r in cached]
+    generation = _cache_generation
+    idx = _title_row(fav_movie) # the first movie for duplicate titles
+    if idx is None:
         return []
 
-    idx = title_to_index[fav_movie]
-    if isinstance(idx, pd.Series): # Handle cases where title_to_index might return multiple matches
-        idx = idx.iloc[0] # Take the first index
-
-    # Get cosine similarity scores, converting tolist() to prevent ValueError
-    sim_scores = list(enumerate(cos_sim[idx].tolist()))
-
-    # Sort by similarity score in descending order
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-
-    # Get top similar movies (excluding the input movie itself)
-    sim_scores = sim_scores[1:50]
-    movie_indices = [i[0] for i in sim_scores]
-    candidates = movies.iloc[movie_indices].copy()
-
-    def calculate_boost_score(row):
-        score = 0
-        reason = []
-
-        if actor and actor in row['top_actors_list']:
-            score += 0.5
-            reason.append(f"Features {actor}")
-        if director and row['director'] and director.lower() == row['director'].lower():
-            score += 0.5
-            reason.append(f"Directed by {director}")
-        if genre and row['genres'] and genre.lower() in row['genres'].lower():
-            score += 0.3
-            reason.append(f"Is a {genre} movie")
-
-        if mood:
-            mood_genre_map = {
-                'happy': ['comedy', 'adventure', 'family'],
-                'sad': ['drama', 'romance'],
-                'excited': ['action', 'sci-fi', 'adventure'],
-                'romantic': ['romance', 'drama'],
-                'curious': ['mystery', 'documentary'],
-                'dark': ['thriller', 'horror', 'crime'],
-                'calm': ['documentary', 'drama', 'history']
-            }
-            related_genres = mood_genre_map.get(mood.lower(), [])
-            if related_genres and row['genres']:
-                if any(g.lower() in row['genres'].lower() for g in related_genres):
-                    score += 0.3
-                    reason.append(f"Matches your '{mood}' mood")
-        return score, "; ".join(reason) if reason else "Similar to your favorite movie"
+    recommendations = _rank_block(np.array([idx]), [actor], [director], [genre], [mood], topn)[0]
+    _cache_put(key, [dict(r) for r in recommendations], generation)
+    return recommendations
 
-    candidates[['boost', 'reason']] = candidates.apply(lambda row: pd.Series(calculate_boost_score(row)), axis=1)
-    candidates['final_score'] = candidates['boost'] + candidates.index.map(lambda x: cos_sim[idx][x])
-    final_recommendations = candidates.sort_values('final_score', ascending=False)
+def _broadcast(values, n, name):
+    """Turns a per-title filter argument (None, one value, or a sequence) into a list of length n."""
+    if values is None or isinstance(values, str):
+        return [values] * n
+    values = list(values)
+    if len(values) != n:
+        raise ValueError(f"'{name}' has {len(values)} values, expected one per title ({n})")
+    return values
 
-    return final_recommendations.head(topn).apply(
-        lambda row: {'title': row['title'], 'tmdb_id': row['tmdb_id'], 'reason': row['reason']}, axis=1
-    ).tolist()
+def _recommend_batch_chunk(args):
+    """Process pool entry point: runs one chunk of recommend_batch on the model of this process."""
+    return recommend_batch(*args) # loads the model first in spawned (not forked) workers
+
+@_requires_model
+@metrics.timed('recommend_batch_seconds')
+def recommend_batch(titles, actors=None, directors=None, genres=None, moods=None, topn=5,
+                    n_jobs=1, chunk_size=5000):
+    """
+    Recommendations for many favorites at once, e.g. for precomputing user profiles.
+    Each filter may be None, a single value for every title, or a sequence with one value per title.
+    Returns one list of recommendation dicts per title ([] for unknown titles), in input order.
+    With n_jobs > 1 the chunks are spread over a process pool. Workers are forked where possible
+    so they share the parent's model pages; otherwise each worker memory-maps the saved artifact.
+    """
+    titles = list(titles)
+    n = len(titles)
+    actors = _broadcast(actors, n, 'actors')
+    directors = _broadcast(directors, n, 'directors')
+    genres = _broadcast(genres, n, 'genres')
+    moods = _broadcast(moods, n, 'moods')
+
+    if movies is None or not title_to_index or n == 0:
+        return [[] for _ in titles]
+
+    if n_jobs > 1 and n > chunk_size:
+        chunks = [
+            (titles[i:i + chunk_size], actors[i:i + chunk_size], directors[i:i + chunk_size],
+             genres[i:i + chunk_size], moods[i:i + chunk_size], topn)
+            for i in range(0, n, chunk_size)
+        ]
+        with _process_pool(min(n_jobs, len(chunks))) as pool:
+            return [result for chunk in pool.map(_recommend_batch_chunk, chunks) for result in chunk]
+
+    # Titles -> rows (first row wins for duplicate titles, like get_recommendations)
+    title_rows = np.array([_title_rows.get(title, -1) for title in titles], dtype=np.int64)
+    found = np.flatnonzero(title_rows >= 0)
+
+    results = [[] for _ in titles]
+    for start in range(0, len(found), chunk_size):
+        block = found[start:start + chunk_size]
+        ranked = _rank_block(
+            title_rows[block],
+            [actors[i] for i in block], [directors[i] for i in block],
+            [genres[i] for i in block], [moods[i] for i in block], topn,
+        )
+        for i, recommendations in zip(block.tolist(), ranked):
+            results[i] = recommendations
+    return results
+
+def normalize_title(title):
+    """Lowercases a title and drops accents and punctuation, e.g. 'Amélie!' -> 'amelie'."""
+    text = unicodedata.normalize('NFKD', str(title))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(_NON_WORD.sub(' ', text).split())
+
+def _title_grams(text):
+    """All 2- and 3-character substrings of a normalized title."""
+    return {text[i:i + n] for n in (2, 3) for i in range(len(text) - n + 1)}
+
+class _SortedKeys:
+    """
+    Sorted (key, id) pairs for prefix lookups with bisect. Added pairs go to a small sorted
+    side list, merged into the main one once that grows past an eighth of it, so adding doesn't
+    rebuild the whole key list every time.
+    """
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ids = np.array([i for _, i in pairs], dtype=np.int32)
+        self.added = [] # sorted (key, id) pairs not merged yet
+
+    def add(self, pairs):
+        for pair in pairs:
+            bisect.insort(self.added, pair)
+        if len(self.added) > 64 + len(self.keys) // 8:
+            self.__init__(list(zip(self.keys, self.ids.tolist())) + self.added)
+
+    def prefixed(self, prefix, exact=False):
+        """ids whose key starts with (or, with exact=True, equals) prefix."""
+        end = bisect.bisect_right(self.keys, prefix) if exact else bisect.bisect_left(self.keys, prefix + '\uffff')
+        ids = self.ids[bisect.bisect_left(self.keys, prefix):end]
+        if not self.added:
+            return ids
+        stop = (prefix, float('inf')) if exact else (prefix + '\uffff',)
+        added = self.added[bisect.bisect_left(self.added, (prefix,)):bisect.bisect_left(self.added, stop)]
+        return np.concatenate([ids, np.array([i for _, i in added], dtype=np.int32)])
+
+class TitleIndex:
+    """
+    Search index over movie titles, built once per model load (add/discard keep it current
+    after incremental catalog updates).
+    Matches are ranked: exact title, title prefix, word prefix, substring, and then, if there is
+    room left, typo-tolerant matches found through shared bigrams. Shorter titles come first
+    within a rank.
+    """
+    FUZZY_CANDIDATES = 10
+    FUZZY_MIN_RATIO = 0.75
+
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self.normalized = [normalize_title(title) for title in self.titles]
+        self.lengths = np.array([len(text) for text in self.normalized], dtype=np.int32)
+        self.visible = np.ones(len(self.titles), dtype=bool) # False once discarded
+        self._ids = {title: i for i, title in enumerate(self.titles)}
+        self._buffers = {} # room for add() to grow the arrays in place (see _extended)
+
+        # Sorted keys for prefix lookups
+        self.by_title = _SortedKeys((text, i) for i, text in enumerate(self.normalized))
+        self.by_word = _SortedKeys({(word, i) for i, text in enumerate(self.normalized) for word in text.split()})
+
+        # n-gram -> ids of the titles containing it
+        postings = {}
+        for i, text in enumerate(self.normalized):
+            for gram in _title_grams(text):
+                postings.setdefault(gram, []).append(i)
+        self.grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def add(self, titles):
+        """Indexes new titles; titles that were discarded become searchable again."""
+        new = []
+        for title in dict.fromkeys(titles):
+            i = self._ids.get(title)
+            if i is None:
+                new.append(title)
+            else:
+                self.visible[i] = True
+        if not new:
+            return
+
+        start = len(self.titles)
+        normalized = [normalize_title(title) for title in new]
+        self.titles.extend(new)
+        self.normalized.extend(normalized)
+        self._ids.update((title, i) for i, title in enumerate(new, start))
+        self.lengths = _extended(self._buffers, 'lengths', self.lengths, [len(text) for text in normalized])
+        self.visible = _extended(self._buffers, 'visible', self.visible, np.ones(len(new), dtype=bool))
+        self.by_title.add((text, i) for i, text in enumerate(normalized, start))
+        self.by_word.add({(word, i) for i, text in enumerate(normalized, start) for word in text.split()})
+
+        postings = {}
+        for i, text in enumerate(normalized, start):
+            for gram in _title_grams(text):
+                postings.setdefault(gram, []).append(i)
+        for gram, ids in postings.items():
+            self.grams[gram] = _extended(self._buffers, gram, self.grams.get(gram, _NO_ROWS), ids)
+
+    def discard(self, titles):
+        """Hides titles from search (they stay in the index and come back with add)."""
+        for title in titles:
+            i = self._ids.get(title)
+            if i is not None:
+                self.visible[i] = False
+
+    def _substring_ids(self, query):
+        if len(query) == 1:
+            return np.array([i for i, text in enumerate(self.normalized) if query in text], dtype=np.int32)
+        n = min(3, len(query))
+        postings = sorted((self.grams.get(query[i:i + n]) for i in range(len(query) - n + 1)),
+                          key=lambda ids: -1 if ids is None else len(ids))
+        if postings[0] is None:
+            return np.empty(0, dtype=np.int32)
+        ids = postings[0]
+        for other in postings[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return np.array([i for i in ids.tolist() if query in self.normalized[i]], dtype=np.int32)
+
+    def _fuzzy_ids(self, query, exclude):
+        # Candidates share the most bigrams with the query; only those get an edit-similarity check
+        bigrams = {query[i:i + 2] for i in range(len(query) - 1)}
+        postings = [self.grams[gram] for gram in bigrams if gram in self.grams]
+        if not postings:
+            return []
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.titles))
+        counts[exclude] = 0
+        counts[~self.visible] = 0
+        # Most shared bigrams first, shorter titles first among equal counts
+        priority = counts * 1024 - np.minimum(self.lengths, 1023)
+        candidates = np.argpartition(-priority, min(self.FUZZY_CANDIDATES, len(counts) - 1))[:self.FUZZY_CANDIDATES]
+        candidates = candidates[counts[candidates] >= max(1, len(bigrams) // 2)]
+
+        # Compare the query with the whole title and with a query-sized window at each word start
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(query)
+        scored = []
+        for i in candidates.tolist():
+            text = self.normalized[i]
+            starts = [0] + [j + 1 for j, ch in enumerate(text) if ch == ' ']
+            best = self.FUZZY_MIN_RATIO - 1e-9 # windows that can't reach the threshold are skipped cheaply
+            for window in [text] + [text[j:j + len(query) + 1] for j in starts]:
+                matcher.set_seq1(window)
+                if matcher.real_quick_ratio() > best and matcher.quick_ratio() > best:
+                    best = max(best, matcher.ratio())
+            if best >= self.FUZZY_MIN_RATIO:
+                scored.append((-best, len(text), i))
+        return [i for _, _, i in sorted(scored)]
+
+    def search(self, query, limit=10):
+        """Returns up to `limit` titles matching `query`, best matches first."""
+        query = normalize_title(query)
+        if not query or limit <= 0:
+            return []
+
+        results = []
+
+        def add(ids):
+            # Appends the best (shortest, then first) new ids of one rank, only as many as needed
+            need = limit - len(results)
+            ids = np.unique(ids)
+            ids = ids[self.visible[ids]]
+            if results:
+                ids = ids[~np.isin(ids, results)]
+            key = self.lengths[ids].astype(np.int64) * len(self.titles) + ids
+            if len(ids) > need:
+                keep = np.argpartition(key, need - 1)[:need]
+                ids, key = ids[keep], key[keep]
+            results.extend(ids[np.argsort(key)].tolist())
+
+        add(self.by_title.prefixed(query, exact=True))
+        for find in (lambda: self.by_title.prefixed(query),
+                     lambda: self.by_word.prefixed(query),
+                     lambda: self._substring_ids(query)):
+            if len(results) >= limit:
+                break
+            add(find())
+        if len(results) < limit and len(query) >= 3:
+            results.extend(self._fuzzy_ids(query, results))
+        return [self.titles[i] for i in results[:limit]]
+
+@_requires_model
+def search_titles(query, limit=10):
+    """Returns up to `limit` movie titles matching `query` (ranked prefix/substring/typo-tolerant)."""
+    if title_search_index is None:
+        return []
+    return title_search_index.search(query, limit)
 
 # Helper function to get movie details from the local DataFrame for display
-def get_movie_details_from_df(movie_title):
+def get_movie_details_from_df(movie_title, tmdb_id=None):
     """
-    Fetches movie details (genres, director, top_actors_list) from the local 'movies' DataFrame.
+    Fetches movie details (genres, director, top actors) from the encoded facet columns.
+    For a title shared by several movies, `tmdb_id` picks one (default: the first loaded).
     """
-    if movies is not None and movie_title in movies['title'].values:
-        movie_row = movies[movies['title'] == movie_title].iloc[0]
-        return {
-            'genres': movie_row['genres'], # This is the space-separated string
-            'director': movie_row['director'],
-            'top_actors': movie_row['top_actors_list'] # This is the list of actors
-        }
-    return {'genres': 'N/A', 'director': 'N/A', 'top_actors': []}
+    return get_movie_details_many([movie_title], None if tmdb_id is None else [tmdb_id])[0]
 
+@_requires_model
+@metrics.timed('movie_details_seconds')
+def get_movie_details_many(titles, tmdb_ids=None):
+    """
+    get_movie_details_from_df for several titles (and optionally their tmdb_ids), with the
+    facets of all of them gathered at once. Returns one details dict per title, in order.
+    """
+    titles = list(titles)
+    tmdb_ids = [None] * len(titles) if tmdb_ids is None else list(tmdb_ids)
+    details = [{'genres': 'N/A', 'director': 'N/A', 'top_actors': []} for _ in titles]
+    if movies is None or title_to_index is None:
+        return details
+
+    positions, rows = [], []
+    for position, (title, tmdb_id) in enumerate(zip(titles, tmdb_ids)):
+        row = _title_row(title, tmdb_id)
+        if row is not None:
+            positions.append(position)
+            rows.append(row)
+    if rows:
+        for position, genres, director, actors in zip(positions, movie_genres.get_many(rows),
+                                                      movie_directors.get_many(rows), movie_actors.get_many(rows)):
+            details[position] = {
+                'genres': ' '.join(genres), # This is the space-separated string
+                'director': director[0],
+                'top_actors': actors # This is the list of actors
+            }
+    return details
+
+
+@_requires_model
+def get_movie_count():
+    """Number of movies in the catalog (titles shared by several movies count each of them)."""
+    return int(_active.sum()) if movies is not None else 0
 
 # --- Helper functions for Streamlit Selectboxes ---
+@_requires_model
 def get_all_movies():
-    """Returns a dictionary mapping movie titles to TMDB IDs."""
-    if movies is not None and not title_to_tmdb_id.empty: # Check if mapping is not empty
-        return title_to_tmdb_id.to_dict()
+    """Returns a dictionary mapping movie titles to TMDB IDs (of the first movie, for duplicate titles)."""
+    if movies is not None and title_to_tmdb_id: # Check if mapping is not empty
+        return dict(title_to_tmdb_id)
     return {}
 
+@_requires_model
 def get_all_actors():
     """Returns a sorted list of unique top actor names."""
     if movies is not None and not movies.empty:
-        all_actors = set()
-        for actors_list_for_movie in movies['top_actors_list'].dropna():
-            for actor_name in actors_list_for_movie:
-                if actor_name:
-                    all_actors.add(actor_name.strip())
-        return sorted(list(all_actors))
+        return list(_actor_vocab)
     return []
 
+@_requires_model
 def get_all_directors():
     """Returns a sorted list of unique director names."""
     if movies is not None and not movies.empty:
-        return sorted(movies['director'].dropna().astype(str).unique().tolist())
+        return list(_director_vocab)
     return []
 
+@_requires_model
 def get_all_genres():
     """Returns a sorted list of unique genre names."""
     if movies is not None and not movies.empty:
-        genre_list = set()
-        for genres_str in movies['genres'].dropna():
-            for genre_name in genres_str.split(' '):
-                if genre_name:
-                    genre_list.add(genre_name.strip())
-        return sorted(list(genre_list))
+        return list(_genre_vocab)
     return []
 
+@_requires_model
+def is_known_genre(genre):
+    """
+    Whether a genre filter can match anything: each of its words is part of some genre word of
+    the catalog ('Science Fiction' and 'fi' are, a typo isn't). Checked against the lowercase
+    genre index, which add/remove_movies keep current.
+    """
+    words = genre.lower().split()
+    return bool(words) and all(word in _genre_token_rows or any(word in token for token in _genre_token_rows)
+                               for word in words)
+
 # CRITICAL FIX: Assign 'recommend' immediately after its definition.
 # This ensures it's available even if load_data() has issues.
 recommend = get_recommendations
-
-# Load data on module import
-load_data()
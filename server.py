@@ -0,0 +1,315 @@
+# server.py
+# Headless HTTP service for the recommender: recommendations, title search and facet lists as JSON.
+# The model is loaded once (memory-mapped from the artifact) before the workers are forked, so all
+# workers share the same read-only pages instead of each holding a copy.
+# Usage: python server.py [--port 8000] [--workers N]
+#
+# Endpoints (GET):
+#   /recommend?title=...&actor=&director=&genre=&mood=&topn=5
+#   /search?q=...&limit=10
+#   /movies /actors /directors /genres
+#   /health /stats
+#   /metrics (Prometheus text; latency histograms need --metrics or METRICS_ENABLED=1)
+# Each worker process keeps its own stats and metrics.
+
+import argparse
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+import model
+
+MAX_TOPN = 50
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of recommendation lists keyed by the request parameters."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+class RecommendBatcher:
+    """
+    Collects concurrent recommend calls of one worker and runs them as a single
+    model.recommend_batch call. A batch is closed after `max_wait` seconds or `max_batch` calls.
+    """
+
+    def __init__(self, max_batch=64, max_wait=0.002):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.batched_calls = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def recommend(self, key):
+        """key: (title, actor, director, genre, mood, topn). Blocks until the batch is done."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    # Started on first use so it lives in the worker process, not the pre-fork parent
+                    self._thread = threading.Thread(target=self._run, name="recommend-batcher", daemon=True)
+                    self._thread.start()
+        future = Future()
+        self._queue.put((key, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self.batches += 1
+            self.batched_calls += len(items)
+
+            # recommend_batch takes one topn, so group by it
+            by_topn = {}
+            for key, future in items:
+                by_topn.setdefault(key[5], []).append((key, future))
+            for topn, group in by_topn.items():
+                keys = [key for key, _ in group]
+                try:
+                    results = model.recommend_batch(
+                        [k[0] for k in keys], actors=[k[1] for k in keys], directors=[k[2] for k in keys],
+                        genres=[k[3] for k in keys], moods=[k[4] for k in keys], topn=topn,
+                    )
+                except Exception as e:
+                    for _, future in group:
+                        future.set_exception(e)
+                    continue
+                for (_, future), result in zip(group, results):
+                    future.set_result(result)
+
+
+cache = ResponseCache()
+batcher = RecommendBatcher()
+
+
+@metrics.register_collector
+def _server_metrics():
+    stats = cache.stats()
+    return {
+        'server_cache_hits_total': stats['hits'],
+        'server_cache_misses_total': stats['misses'],
+        'server_cache_entries': stats['entries'],
+        'server_batches_total': batcher.batches,
+        'server_batched_calls_total': batcher.batched_calls,
+    }
+
+
+class RecommenderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+    disable_nagle_algorithm = True
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip('/') == '/metrics':
+            return self.send_body(200, metrics.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4')
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = {
+            '/recommend': self.recommend,
+            '/search': self.search,
+            '/movies': lambda _: (200, model.get_all_movies()),
+            '/actors': lambda _: (200, model.get_all_actors()),
+            '/directors': lambda _: (200, model.get_all_directors()),
+            '/genres': lambda _: (200, model.get_all_genres()),
+            '/health': lambda _: (200, {'status': 'ok', 'movies': model.get_movie_count()}),
+            '/stats': self.stats,
+        }.get(url.path.rstrip('/') or '/')
+        if route is None:
+            return self.send_json(404, {'error': f"unknown path '{url.path}'"})
+        try:
+            status, body = route(params)
+        except ValueError as e:
+            status, body = 400, {'error': str(e)}
+        except Exception as e:
+            print(f"Error handling {self.path}: {e}")
+            status, body = 500, {'error': 'internal error'}
+        self.send_json(status, body)
+
+    def recommend(self, params):
+        title = params.get('title')
+        if not title:
+            raise ValueError("'title' is required")
+        try:
+            topn = int(params.get('topn', 5))
+        except ValueError:
+            topn = 0
+        if not 1 <= topn <= MAX_TOPN:
+            raise ValueError(f"'topn' must be between 1 and {MAX_TOPN}")
+        if title not in model.title_to_index:
+            return 404, {'error': f"unknown title '{title}'"}
+        # Only filter values the model knows: arbitrary strings would each cost a catalog scan
+        genre, mood = params.get('genre'), params.get('mood')
+        if genre and not model.is_known_genre(genre):
+            raise ValueError(f"unknown genre '{genre}' (see /genres)")
+        if mood and mood.lower() not in model.MOOD_GENRE_MAP:
+            raise ValueError(f"unknown mood '{mood}', expected one of {', '.join(model.MOOD_GENRE_MAP)}")
+
+        # Empty filters mean "no preference", same as in the app
+        key = (title, params.get('actor') or None, params.get('director') or None,
+               params.get('genre') or None, params.get('mood') or None, topn)
+        recommendations = cache.get(key)
+        if recommendations is None:
+            recommendations = batcher.recommend(key)
+            cache.put(key, recommendations)
+        return 200, {'title': title, 'recommendations': recommendations}
+
+    def search(self, params):
+        limit = int(params.get('limit', 10))
+        return 200, model.search_titles(params.get('q', ''), max(0, min(limit, 100)))
+
+    def stats(self, _):
+        return 200, {
+            'pid': os.getpid(),
+            'cache': cache.stats(),
+            'batches': batcher.batches,
+            'batched_calls': batcher.batched_calls,
+            'metrics': metrics.snapshot(),
+        }
+
+    def send_json(self, status, body):
+        self.send_body(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+    def send_body(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class RecommenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # the default of 5 drops connection bursts (clients retry after 1s)
+
+
+def serve(host="127.0.0.1", port=8000, workers=1, quiet=False):
+    """
+    Serves until interrupted. With workers > 1 the listening socket is shared by forked worker
+    processes (each one multi-threaded, with its own batcher and response cache).
+    """
+    RecommenderHandler.quiet = quiet
+    # Load before forking, so the workers share the model pages instead of each loading it
+    model.ensure_loaded()
+    server = RecommenderServer((host, port), RecommenderHandler)
+    if workers > 1 and not hasattr(os, 'fork'):
+        print("Worker processes need os.fork, serving from a single process")
+        workers = 1
+    print(f"Serving {model.get_movie_count()} movies on http://{host}:{server.server_address[1]} "
+          f"with {workers} worker(s)", flush=True)
+
+    if workers <= 1:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Movie recommender HTTP service")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=batcher.max_batch)
+    parser.add_argument('--batch-wait-ms', type=float, default=batcher.max_wait * 1000)
+    parser.add_argument('--cache-size', type=int, default=cache.max_entries)
+    parser.add_argument('--quiet', action='store_true', help="don't log every request")
+    parser.add_argument('--metrics', action='store_true', help="record latency histograms (see metrics.py)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    batcher.max_batch = args.batch_size
+    batcher.max_wait = args.batch_wait_ms / 1000
+    cache.max_entries = args.cache_size
+    serve(args.host, args.port, args.workers, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# tmdb_client.py
+# Asyncio client for the TMDb movie endpoint: rate limited, retrying, with request coalescing.
+# utils.get_movie_details keeps its synchronous signature and runs this client on a background loop.
+
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts of up to `capacity`.
+    A rate of None or 0 disables the limit. The capacity is at least one token, so rates
+    below one per second still get a token every 1 / rate seconds.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = max(1, capacity or rate or 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncTMDBClient:
+    """
+    Fetches /movie/{id} from TMDb.
+    - Concurrent requests for the same id share one in-flight request.
+    - Requests go through a token bucket (`rate_limit` per second, `burst` at once).
+    - 429 and 5xx answers, timeouts and connection errors are retried with exponential backoff
+      (Retry-After is honoured), up to `max_retries` times.
+    HTTP runs on a pooled keep-alive requests.Session in worker threads, at most
+    `max_concurrency` at a time. The client must be used from a single event loop.
+    """
+
+    def __init__(self, api_key, base_url="https://api.themoviedb.org/3", rate_limit=40, burst=None,
+                 max_retries=3, backoff=0.5, timeout=(3.05, 10), max_concurrency=8):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.stats = {'calls': 0, 'coalesced': 0, 'requests': 0, 'retries': 0, 'failures': 0}
+
+        self._inflight = {} # tmdb_id -> task
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    async def get_movie(self, tmdb_id):
+        """Returns the movie JSON as a dict, or None if the request failed."""
+        self.stats['calls'] += 1
+        task = self._inflight.get(tmdb_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(tmdb_id))
+            self._inflight[tmdb_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(tmdb_id, None))
+        else:
+            self.stats['coalesced'] += 1
+        # shield: one caller being cancelled must not cancel the request the others wait for
+        return await asyncio.shield(task)
+
+    async def get_movies(self, tmdb_ids):
+        """get_movie for several ids concurrently, results in the same order."""
+        return await asyncio.gather(*(self.get_movie(tmdb_id) for tmdb_id in tmdb_ids))
+
+    async def _fetch(self, tmdb_id):
+        url = f"{self.base_url}/movie/{tmdb_id}"
+        params = {'api_key': self.api_key, 'language': 'en-US'}
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            retry_after = None
+            try:
+                async with self._slots:
+                    self.stats['requests'] += 1
+                    with metrics.timer('tmdb_request_seconds'):
+                        response = await asyncio.to_thread(self._session.get, url, params=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status() # Raise an HTTPError for bad responses (4xx)
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get('Retry-After')
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except requests.exceptions.RequestException as e:
+                print(f"TMDb API request error: {e}")
+                break
+            except ValueError as e: # For json decoding errors
+                print(f"TMDb API JSON decoding error: {e}")
+                break
+            except Exception as e:
+                print(f"An unexpected error occurred in TMDb fetch: {e}")
+                break
+
+            if attempt == self.max_retries:
+                print(f"TMDb API request error: {error} (gave up after {attempt + 1} attempts)")
+                break
+            self.stats['retries'] += 1
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = self.backoff * 2 ** attempt * (1 + random.random())
+            await asyncio.sleep(delay)
+
+        self.stats['failures'] += 1
+        return None
+
+    def close(self):
+        self._session.close()
+
+
+class BackgroundLoop:
+    """An event loop running in a daemon thread, for calling async code from sync code."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="tmdb-client-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=None):
+        """
+        Runs the coroutine on the background loop and blocks until it is done. After `timeout`
+        seconds the coroutine is cancelled and concurrent.futures.TimeoutError is raised.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
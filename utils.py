@@ -1,42 +1,245 @@
-import requests
 import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv # Add this line
+import metrics
+from tmdb_client import AsyncTMDBClient, BackgroundLoop
 
 # Load environment variables from .env file
 load_dotenv() # Add this line
 
 # Use your own TMDB API Key
 TMDB_API_KEY = os.getenv("TMDB_API_KEY") # No fallback needed if you ensure it's in .env
+# Overridable so the client can be pointed at a local stub server
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+TMDB_TIMEOUT = (3.05, 10) # (connect, read) seconds
+TMDB_MAX_WORKERS = 8 # Concurrent requests to TMDb (also the connection pool size)
+TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", 40)) # requests per second, 0 disables the limit
+TMDB_MAX_RETRIES = 3 # for 429/5xx answers and network errors
+# Longest a get_movie_details(_many) call waits for TMDb; what hasn't arrived by then is EMPTY_DETAILS
+TMDB_DEADLINE = float(os.getenv("TMDB_DEADLINE", 30)) # seconds
 
-def get_movie_details(tmdb_id):
+# Details cache: an in-process LRU in front of an SQLite file shared by all processes
+TMDB_CACHE_PATH = os.getenv("TMDB_CACHE_PATH", ".tmdb_cache.sqlite")
+TMDB_CACHE_TTL = float(os.getenv("TMDB_CACHE_TTL", 7 * 24 * 3600)) # seconds
+TMDB_CACHE_MAX_ENTRIES = int(os.getenv("TMDB_CACHE_MAX_ENTRIES", 50000)) # on disk, least recently used are evicted
+TMDB_MEMORY_CACHE_SIZE = 2048
+
+EMPTY_DETAILS = ("", "N/A", "")
+
+_client = None
+_client_settings = None # the TMDB_* settings _client was made with
+_client_loop = None
+_client_lock = threading.Lock()
+_memory_cache = OrderedDict() # tmdb_id -> (expires_at, details)
+_memory_lock = threading.Lock()
+_db_local = threading.local()
+_cache_stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+
+def _count(stat, n=1):
+    with _stats_lock:
+        _cache_stats[stat] += n
+
+def _get_client():
     """
-    Fetches poster URL, IMDb rating, and tagline using TMDb API.
+    Returns the process-wide async TMDb client and the background loop it runs on (created on
+    first use). Sharing one client lets concurrent callers coalesce and respect one rate limit.
+    The TMDB_* settings are read on every call, and a new client is made when they changed
+    (e.g. TMDB_BASE_URL pointed at a stub server), like _get_db does for TMDB_CACHE_PATH.
+    """
+    global _client, _client_settings, _client_loop
+    settings = (TMDB_API_KEY, TMDB_BASE_URL, TMDB_RATE_LIMIT, TMDB_MAX_RETRIES, TMDB_TIMEOUT, TMDB_MAX_WORKERS)
+    if _client is None or _client_settings != settings:
+        with _client_lock:
+            if _client_loop is None:
+                _client_loop = BackgroundLoop()
+            if _client is None or _client_settings != settings:
+                # The old client isn't closed: other threads may still be waiting on its requests
+                api_key, base_url, rate_limit, max_retries, timeout, max_workers = settings
+                _client = AsyncTMDBClient(
+                    api_key, base_url=base_url, rate_limit=rate_limit,
+                    max_retries=max_retries, timeout=timeout, max_concurrency=max_workers,
+                )
+                _client_settings = settings
+    return _client, _client_loop
+
+def _get_db():
+    """Returns this thread's connection to the on-disk cache (None if it can't be opened)."""
+    db = getattr(_db_local, 'db', None)
+    if db is None or _db_local.path != TMDB_CACHE_PATH:
+        try:
+            db = sqlite3.connect(TMDB_CACHE_PATH, timeout=5)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS movie_details ("
+                "tmdb_id INTEGER PRIMARY KEY, details TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS movie_details_accessed ON movie_details (accessed_at)")
+            db.commit()
+        except sqlite3.Error as e:
+            print(f"TMDb cache unavailable ({TMDB_CACHE_PATH}): {e}")
+            db = None
+        _db_local.db = db
+        _db_local.path = TMDB_CACHE_PATH
+    return db
+
+def _cache_get_many(tmdb_ids):
+    """Looks ids up in memory, then on disk. Returns {tmdb_id: details} for the hits."""
+    now = time.time()
+    found = {}
+    with _memory_lock:
+        for tmdb_id in tmdb_ids:
+            entry = _memory_cache.get(tmdb_id)
+            if entry is not None:
+                if entry[0] > now:
+                    _memory_cache.move_to_end(tmdb_id)
+                    found[tmdb_id] = entry[1]
+                else:
+                    del _memory_cache[tmdb_id]
+    _count('memory_hits', len(found))
+
+    missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in found]
+    db = _get_db() if missing else None
+    if db is not None:
+        try:
+            placeholders = ",".join("?" * len(missing))
+            rows = db.execute(
+                f"SELECT tmdb_id, details, fetched_at FROM movie_details "
+                f"WHERE tmdb_id IN ({placeholders}) AND fetched_at > ?",
+                (*missing, now - TMDB_CACHE_TTL),
+            ).fetchall()
+            if rows:
+                db.executemany("UPDATE movie_details SET accessed_at = ? WHERE tmdb_id = ?",
+                               [(now, row[0]) for row in rows])
+                db.commit()
+            disk_hits = {}
+            for tmdb_id, details, fetched_at in rows:
+                disk_hits[tmdb_id] = (fetched_at + TMDB_CACHE_TTL, tuple(json.loads(details)))
+            _memory_put(disk_hits)
+            found.update({tmdb_id: entry[1] for tmdb_id, entry in disk_hits.items()})
+            _count('disk_hits', len(disk_hits))
+        except sqlite3.Error as e:
+            print(f"TMDb cache read error: {e}")
+    return found
+
+def _memory_put(entries):
+    """entries: {tmdb_id: (expires_at, details)}"""
+    with _memory_lock:
+        for tmdb_id, entry in entries.items():
+            _memory_cache[tmdb_id] = entry
+            _memory_cache.move_to_end(tmdb_id)
+        while len(_memory_cache) > TMDB_MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+def _cache_put_many(details_by_id):
+    now = time.time()
+    _memory_put({tmdb_id: (now + TMDB_CACHE_TTL, details) for tmdb_id, details in details_by_id.items()})
+    db = _get_db()
+    if db is None:
+        return
+    try:
+        db.executemany(
+            "INSERT OR REPLACE INTO movie_details (tmdb_id, details, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+            [(tmdb_id, json.dumps(details), now, now) for tmdb_id, details in details_by_id.items()],
+        )
+        # Expired entries go first, then the least recently used ones above the size limit
+        db.execute("DELETE FROM movie_details WHERE fetched_at <= ?", (now - TMDB_CACHE_TTL,))
+        db.execute(
+            "DELETE FROM movie_details WHERE tmdb_id IN (SELECT tmdb_id FROM movie_details "
+            "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (TMDB_CACHE_MAX_ENTRIES,),
+        )
+        db.commit()
+    except sqlite3.Error as e:
+        print(f"TMDb cache write error: {e}")
+
+def get_cache_stats():
+    """Returns hit/miss counters of the details cache (hits are from memory or disk)."""
+    with _stats_lock:
+        stats = dict(_cache_stats)
+    hits = stats['memory_hits'] + stats['disk_hits']
+    lookups = hits + stats['misses']
+    stats['hits'] = hits
+    stats['hit_rate'] = hits / lookups if lookups else 0.0
+    stats['memory_entries'] = len(_memory_cache)
+    return stats
+
+@metrics.register_collector
+def _cache_metrics():
+    """Cache and TMDb client counters for metrics.snapshot()/prometheus_text()."""
+    stats = get_cache_stats()
+    values = {f'tmdb_cache_{stat}_total': stats[stat] for stat in ('memory_hits', 'disk_hits', 'misses')}
+    values['tmdb_errors_total'] = stats['errors']
+    values['tmdb_cache_memory_entries'] = stats['memory_entries']
+    if _client is not None:
+        values.update({f'tmdb_client_{stat}_total': value for stat, value in _client.stats.items()})
+    return values
+
+def clear_cache(disk=True):
+    """Empties the in-process cache (and the on-disk one) and resets the counters."""
+    with _memory_lock:
+        _memory_cache.clear()
+    with _stats_lock:
+        for stat in _cache_stats:
+            _cache_stats[stat] = 0
+    db = _get_db() if disk else None
+    if db is not None:
+        db.execute("DELETE FROM movie_details")
+        db.commit()
+
+def _parse_movie_details(data):
+    """Turns the TMDb movie JSON into (poster_url, rating, tagline)."""
+    # Construct image URL and extract rating & tagline
+    poster_path = data.get('poster_path')
+    poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
+    rating = data.get('vote_average', 'N/A')
+    tagline = data.get('tagline', '')
+    return poster_url, rating, tagline
+
+@metrics.timed('tmdb_details_seconds')
+def get_movie_details_many(tmdb_ids):
+    """
+    Fetches (poster_url, rating, tagline) for several movies, in the order of tmdb_ids.
+    Cached entries are served from memory/disk; the misses are fetched concurrently by the
+    shared async client (rate limited, retried, and coalesced with other callers' requests).
     """
+    tmdb_ids = [int(tmdb_id) for tmdb_id in tmdb_ids]
     if not TMDB_API_KEY:
         print("TMDB_API_KEY is not set. Please set it as an environment variable.")
-        return "", "N/A", ""
+        return [EMPTY_DETAILS for _ in tmdb_ids]
 
-    base_url = "https://api.themoviedb.org/3/movie/{}?api_key={}&language=en-US"
-    url = base_url.format(tmdb_id, TMDB_API_KEY)
+    unique_ids = list(dict.fromkeys(tmdb_ids))
+    found = _cache_get_many(unique_ids)
+    missing = [tmdb_id for tmdb_id in unique_ids if tmdb_id not in found]
+    _count('misses', len(missing))
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
-
-        # Construct image URL and extract rating & tagline
-        poster_path = data.get('poster_path')
-        poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
-        rating = data.get('vote_average', 'N/A')
-        tagline = data.get('tagline', '')
-
-        return poster_url, rating, tagline
-    except requests.exceptions.RequestException as e:
-        print(f"TMDb API request error: {e}")
-        return "", "N/A", ""
-    except ValueError as e: # For json decoding errors
-        print(f"TMDb API JSON decoding error: {e}")
-        return "", "N/A", ""
-    except Exception as e:
-        print(f"An unexpected error occurred in TMDb fetch: {e}")
-        return "", "N/A", ""
+    if missing:
+        client, loop = _get_client()
+        fetched = {}
+        try:
+            results = loop.run(client.get_movies(missing), timeout=TMDB_DEADLINE)
+        except FutureTimeoutError:
+            print(f"TMDb API request error: no answer within {TMDB_DEADLINE}s for {len(missing)} movie(s)")
+            results = [None] * len(missing)
+        for tmdb_id, data in zip(missing, results):
+            if isinstance(data, dict):
+                fetched[tmdb_id] = _parse_movie_details(data)
+            else:
+                _count('errors')
+        # Errors are not cached so the next call retries them
+        _cache_put_many(fetched)
+        found.update(fetched)
+
+    return [found.get(tmdb_id, EMPTY_DETAILS) for tmdb_id in tmdb_ids]
+
+def get_movie_details(tmdb_id):
+    """
+    Fetches poster URL, IMDb rating, and tagline using TMDb API.
+    Results are cached per tmdb_id (see TMDB_CACHE_*).
+    """
+    return get_movie_details_many([tmdb_id])[0]